@@ -0,0 +1,34 @@
+"""
+Measures how the mode file generator scales with the number of classes in a schema.
+Run with `python benchmark/mode_scaling.py [CLASS_COUNT ...]`.
+`convert` is the part of that time spent converting the classes, rather than loading the schema and writing the JSON.
+"""
+from pathlib import Path
+from time import perf_counter
+import tempfile
+
+import click
+from linkml_runtime import SchemaView
+
+from proclaim.mode.generator import RoCrateModeGenerator
+from proclaim.schema_context import SchemaContext
+from proclaim.synthetic import SyntheticSchema
+
+@click.command()
+@click.argument("class_counts", type=int, nargs=-1)
+def cli(class_counts: tuple[int, ...]):
+    print("classes\tseconds\tconvert")
+    for classes in class_counts or (100, 1000, 10000):
+        with tempfile.TemporaryDirectory() as tmp:
+            context = SchemaContext(SchemaView(SyntheticSchema(classes=classes).write(Path(tmp))))
+            start = perf_counter()
+            RoCrateModeGenerator(schema=context.sv.schema, context=context).serialize()
+            total = perf_counter() - start
+            # The schema queries are now cached, so this only times the conversion
+            start = perf_counter()
+            for _ in RoCrateModeGenerator(schema=context.sv.schema, context=context).iter_classes():
+                pass
+            print(f"{classes}\t{total:.3f}\t{perf_counter() - start:.3f}")
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,38 @@
+"""
+pytest-benchmark suite for the stages of a profile crate build.
+Run with `pytest benchmark`, and compare runs with `--benchmark-autosave` and `--benchmark-compare`.
+Every stage runs in the same process, so this only measures time. `proclaim-bench` runs each stage in its own process, and also measures peak memory.
+"""
+from pathlib import Path
+
+import pytest
+
+from proclaim.benchmark import STAGES
+from proclaim.profile_crate.generator import ProfileCrateGenerator
+from proclaim.synthetic import SyntheticSchema
+
+@pytest.fixture(scope="module", params=[10, 100, 1000])
+def schema_path(request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return SyntheticSchema(classes=request.param).write(tmp_path_factory.mktemp("schema"))
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_stage(benchmark, schema_path: Path, tmp_path: Path, stage: str):
+    generator = ProfileCrateGenerator(str(schema_path), base_dir=str(schema_path.parent), renderer="direct")
+    generator.context.warm()
+
+    def setup():
+        crate = generator.make_crate(tmp_path)
+        if stage in ["make_docs", "write_metadata"]:
+            # These describe the artifacts of the earlier stages
+            for earlier in ProfileCrateGenerator.independent_stages:
+                generator.record_stage(earlier, tmp_path, crate)
+        return (crate,), {}
+
+    def run(crate):
+        if stage == "write_metadata":
+            generator.write_metadata(crate)
+        else:
+            generator.record_stage(stage, tmp_path, crate)
+
+    benchmark.pedantic(run, setup=setup, rounds=3)
+    benchmark.extra_info["classes"] = len(generator.context.classes)
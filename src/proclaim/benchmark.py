@@ -0,0 +1,128 @@
+"""
+Measures the wall time and peak memory of each stage of a profile crate build, over schemas of increasing size.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import get_context
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+import json
+import tempfile
+
+import click
+
+from proclaim.profile_crate.generator import ProfileCrateGenerator
+from proclaim.profile_crate.manifest import Triple
+from proclaim.synthetic import SyntheticSchema
+from proclaim.timings import peak_rss
+
+#: Every stage of a profile crate build, in the order that `ProfileCrateGenerator.serialize` runs them.
+#: `write_metadata` is the final write of `ro-crate-metadata.json`.
+STAGES = [*ProfileCrateGenerator.independent_stages, "make_docs", "write_metadata"]
+
+@dataclass
+class StageMeasurement:
+    """
+    Resources used by one stage, for one schema
+    """
+    stage: str
+    classes: int
+    "Number of classes in the schema"
+    seconds: float
+    "Wall time of the stage"
+    peak_rss: int
+    "Peak resident set size, in bytes, of the process that ran the stage, including loading the schema"
+
+def run_stage(generator_args: dict[str, Any], stage: str, directory: Path, triples: list[Triple]) -> tuple[float, int, list[Triple]]:
+    """
+    Runs and times a single stage in a worker process.
+    The schema is loaded, and its derived queries are computed, before the timer starts.
+
+    Params:
+        triples: Crate entities added by earlier stages, which later stages describe
+
+    Returns:
+        The stage's wall time, the worker's peak RSS, and the triples that the stage added to the crate
+    """
+    generator = ProfileCrateGenerator(**generator_args)
+    generator.context.warm()
+    crate = generator.make_crate(directory)
+    for triple in triples:
+        crate.graph.add(triple)
+    start = perf_counter()
+    if stage == "write_metadata":
+        generator.write_metadata(crate)
+        added = []
+    else:
+        added = generator.record_stage(stage, directory, crate)
+    return perf_counter() - start, peak_rss(), added
+
+def measure(schema_path: Path, classes: int, directory: Path, stages: list[str] = STAGES, **generator_args: Any) -> list[StageMeasurement]:
+    """
+    Builds a profile crate, running each stage in a fresh process so that their peak memory can be measured separately
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    args = {"schema": str(schema_path), "base_dir": str(schema_path.parent), **generator_args}
+    triples: list[Triple] = []
+    measurements = []
+    for stage in STAGES:
+        if stage not in stages:
+            continue
+        # Spawned processes don't share the memory of this one, so their peak RSS only reflects their own work
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            seconds, rss, added = pool.submit(run_stage, args, stage, directory, triples).result()
+        triples += added
+        measurements.append(StageMeasurement(stage=stage, classes=classes, seconds=seconds, peak_rss=rss))
+    return measurements
+
+@click.command()
+@click.option(
+    "--classes",
+    "-c",
+    "class_counts",
+    type=int,
+    multiple=True,
+    default=[10, 100, 1000],
+    show_default=True,
+    help="Number of classes in each synthetic schema. Can be given more than once.",
+)
+@click.option(
+    "--stage",
+    "-s",
+    "stages",
+    type=click.Choice(STAGES),
+    multiple=True,
+    help="Stage to measure. Can be given more than once. By default, every stage is measured.",
+)
+@click.option(
+    "--renderer",
+    type=click.Choice(["mkdocs", "direct"]),
+    default="mkdocs",
+    show_default=True,
+    help="How the HTML pages are built",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="JSON file to which the measurements are written",
+)
+def cli(class_counts: tuple[int, ...], stages: tuple[str, ...], renderer: str, output: Path | None):
+    """
+    Times each stage of a profile crate build over synthetic schemas of increasing size, and records their peak memory
+    """
+    measurements: list[StageMeasurement] = []
+    print("classes\tstage\tseconds\tpeak RSS (MiB)")
+    for classes in class_counts:
+        with tempfile.TemporaryDirectory() as _tmp:
+            tmp = Path(_tmp)
+            schema_path = SyntheticSchema(classes=classes).write(tmp / "schema")
+            for measurement in measure(schema_path, classes, tmp / "crate", list(stages or STAGES), renderer=renderer):
+                print(f"{classes}\t{measurement.stage}\t{measurement.seconds:.3f}\t{measurement.peak_rss / 2**20:.1f}")
+                measurements.append(measurement)
+    if output is not None:
+        output.write_text(json.dumps([asdict(measurement) for measurement in measurements], indent=4))
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,92 @@
+"""
+Options shared by the command-line entry points.
+This module only depends on click, so that `--help` and `--version` don't load LinkML, rdflib or MkDocs.
+Each command imports its generator when it runs.
+"""
+from importlib.metadata import version
+from pathlib import Path
+from typing import Callable, TypeVar
+import logging
+import sys
+
+import click
+from click import Argument, Option
+
+from proclaim.paths import DEFAULT_SOCKET
+
+F = TypeVar("F", bound=click.Command)
+
+#: Choices of `--log_level`, as in `linkml.cli.logging`
+LOG_LEVEL_STRINGS = ["CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"]
+
+def linkml_version() -> str:
+    """
+    Version of LinkML, which the commands report for `--version`, like the LinkML generators do.
+    This reads the package metadata, because importing `linkml._version` loads all of `linkml`.
+    """
+    return version("linkml")
+
+def version_option(func: F) -> F:
+    return click.version_option(linkml_version(), "-V", "--version")(func)
+
+def shared_arguments(valid_formats: list[str], accepts_directory_input: bool = False, required: bool = True) -> Callable[[F], F]:
+    """
+    Adds the arguments common to all generators, like `linkml.utils.generator.shared_arguments`, but without importing LinkML.
+
+    Params:
+        valid_formats: The generator's `valid_formats`
+        required: If false, the schema argument can be omitted, for commands that can find their schemas some other way
+    """
+    def verbosity_callback(ctx: click.Context, param: click.Parameter, verbose: int) -> None:
+        if verbose >= 2:
+            logging.basicConfig(level=logging.DEBUG, force=True)
+        elif verbose == 1:
+            logging.basicConfig(level=logging.INFO, force=True)
+
+    def stacktrace_callback(ctx: click.Context, param: click.Parameter, stacktrace: bool) -> None:
+        if not stacktrace:
+            sys.tracebacklimit = 0
+
+    def log_level_callback(ctx: click.Context, param: click.Parameter, value: str) -> None:
+        logging.basicConfig(level=getattr(logging, value.upper()))
+
+    def decorator(f: F) -> F:
+        f.params.extend([
+            Argument(("yamlfile",), type=click.Path(exists=True, dir_okay=accepts_directory_input, path_type=Path), required=required),
+            Option(("--format", "-f"), type=click.Choice(valid_formats), default=valid_formats[0], show_default=True, help="Output format"),
+            Option(("--metadata/--no-metadata",), default=True, show_default=True, help="Include metadata in output"),
+            Option(
+                ("--generation-date/--no-generation-date", "include_generation_date"),
+                default=False,
+                show_default=True,
+                help="Stamp output with the generation_date timestamp. Off by default so output is reproducible across runs.",
+            ),
+            Option(("--useuris/--metauris",), default=True, show_default=True, help="Use class and slot URIs over model uris"),
+            Option(("--importmap", "-im"), type=click.File(), help="Import mapping file"),
+            Option(("--log_level",), type=click.Choice(LOG_LEVEL_STRINGS), default="WARNING", show_default=True, help="Logging level", callback=log_level_callback),
+            Option(("--verbose", "-v"), count=True, help="Verbosity. Takes precedence over --log_level.", callback=verbosity_callback),
+            Option(("--mergeimports/--no-mergeimports",), default=True, help="Merge imports into source file (default=mergeimports)"),
+            Option(("--stacktrace/--no-stacktrace",), default=False, show_default=True, help="Print a stack trace when an error occurs", callback=stacktrace_callback),
+        ])
+        return f
+    return decorator
+
+def server_options(func: F) -> F:
+    """
+    Adds the options that send the command's work to a `proclaim-serve` daemon
+    """
+    func = click.option(
+        "--socket",
+        "socket_path",
+        type=click.Path(dir_okay=False, path_type=Path),
+        default=DEFAULT_SOCKET,
+        show_default=True,
+        help="Socket of the proclaim-serve daemon used by --server",
+    )(func)
+    func = click.option(
+        "--server",
+        "use_server",
+        is_flag=True,
+        help="Ask a running proclaim-serve daemon to do the work, which avoids loading the schema and generators again. If no daemon is running, the work is done in this process. Profiling, and LinkML options such as --importmap, only apply in this process.",
+    )(func)
+    return func
@@ -0,0 +1,341 @@
+import os
+import re
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Any
+
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import ClassDefinition, EnumDefinition, SchemaDefinition, SlotDefinition, TypeDefinition
+from linkml_runtime.linkml_model.types import SHEX
+from linkml_runtime.utils.formatutils import camelcase, sfx, underscore
+from linkml_runtime.utils.namespaces import Namespaces
+from rdflib import SKOS, XSD
+
+logger = getLogger(__name__)
+
+#: Type URIs whose values are IRIs rather than literals
+URI_RANGES = (SHEX.nonliteral, SHEX.bnode, SHEX.iri)
+
+#: Scoped context of slots whose range is an enum, which maps the parts of a permissible value to SKOS
+ENUM_CONTEXT = {
+    "text": "skos:notation",
+    "description": "skos:prefLabel",
+    "meaning": "@id",
+}
+
+#: Namespaces that end in one of these characters can be used as prefixes without marking them with `@prefix`
+PREFIX_DELIMITER = re.compile(r".*[:/\?#\[\]@]$")
+
+#: Metaslots that the context depends on, which a slot inherits from its `is_a` parent and mixins
+INHERITED_SLOTS = ["range", "identifier"]
+
+def make_jsonld_context(sv: SchemaView) -> dict[str, Any]:
+    """
+    Builds a JSON-LD context for the schema, equal to that of linkml's `ContextGenerator` without metadata.
+    Unlike `ContextGenerator`, this reuses the already-loaded schema view rather than parsing and resolving the entire import tree again.
+    """
+    return ContextBuilder(sv).build()
+
+@dataclass
+class ContextBuilder:
+    """
+    Follows the steps of `ContextGenerator`, which visits each slot and then each class of the schema with its imports merged into it.
+    The schema view is only read, never modified.
+    """
+    sv: SchemaView
+    namespaces: Namespaces = field(init=False, default_factory=Namespaces)
+    "Every prefix declared by the schema and its imports, as merged by linkml's `SchemaLoader`"
+    emit_prefixes: set[str] = field(init=False, default_factory=set)
+    "Prefixes that are included in the context"
+    schema_defaults: dict[str, str] = field(init=False, default_factory=dict)
+    "Maps the ID of each schema to its default prefix, which is the namespace of elements without a URI"
+    vocab: str = field(init=False, default="")
+
+    def build(self) -> dict[str, Any]:
+        root = self.sv.schema
+        imports = self.imported_schemas()
+        self.load_namespaces(root, imports)
+        body = self.schema_body(root, imports)
+
+        slots = self.slots()
+        for name in sorted(slots, key=str.lower):
+            term, slot, from_schema = slots[name]
+            definition = self.slot_definition(slot, term, from_schema)
+            if definition:
+                body[underscore(term)] = definition
+
+        classes = self.sv.all_classes()
+        for cname in sorted(classes, key=str.lower):
+            body[camelcase(cname)] = self.class_definition(classes[cname])
+
+        context: dict[str, Any] = {"xsd": "http://www.w3.org/2001/XMLSchema#"}
+        for prefix in sorted(self.emit_prefixes):
+            url = str(self.namespaces[prefix])
+            context[prefix] = url if PREFIX_DELIMITER.match(url) else {"@id": url, "@prefix": True}
+        return {"@context": {**context, **body}}
+
+    def imported_schemas(self) -> list[SchemaDefinition]:
+        """
+        Returns the imported schemas in the order that `SchemaLoader` merges them: breadth first, with relative imports
+        resolved against the importing schema, and each schema only once
+        """
+        self.sv.imports_closure()
+        root = self.sv.schema
+        pending = list(root.imports)
+        seen = {root.id}
+        schemas = []
+        for imported in pending:
+            schema = self.sv.schema_map.get(imported)
+            if schema is None or schema.id in seen:
+                continue
+            seen.add(schema.id)
+            schemas.append(schema)
+            for nested in schema.imports:
+                if nested.startswith("."):
+                    nested = os.path.normpath(os.path.join(os.path.dirname(imported), nested))
+                if nested not in pending:
+                    pending.append(nested)
+        return schemas
+
+    def load_namespaces(self, root: SchemaDefinition, imports: list[SchemaDefinition]) -> None:
+        for prefix in root.prefixes.values():
+            self.namespaces[prefix.prefix_prefix] = prefix.prefix_reference
+        for cmap in root.default_curi_maps:
+            self.namespaces.add_prefixmap(cmap, include_defaults=False)
+        for schema in imports:
+            for prefix in schema.prefixes.values():
+                # Relative prefixes can't be adjusted to the importing schema, so the first definition is kept
+                if "://" in prefix.prefix_reference or prefix.prefix_prefix not in self.namespaces:
+                    self.namespaces[prefix.prefix_prefix] = prefix.prefix_reference
+            for cmap in schema.default_curi_maps:
+                self.namespaces.add_prefixmap(cmap)
+        for schema in [root, *imports]:
+            self.schema_defaults[str(schema.id)] = str(schema.default_prefix or sfx(str(schema.id)))
+
+    def schema_body(self, root: SchemaDefinition, imports: list[SchemaDefinition]) -> dict[str, Any]:
+        """
+        Returns the start of the context body, and adds the prefixes that the schema declares
+        """
+        self.emit_prefixes.update(root.prefixes.keys())
+        for schema in [root, *imports]:
+            for prefix in schema.emit_prefixes:
+                self.add_prefix(prefix)
+
+        default_prefix = self.schema_defaults[str(root.id)]
+        default_ns = self.namespaces.prefix_for(default_prefix)
+        if default_ns:
+            self.vocab = str(self.namespaces[default_ns])
+            self.emit_prefixes.add(default_ns)
+        else:
+            self.vocab = default_prefix
+            self.namespaces[str(root.name)] = default_prefix
+            self.emit_prefixes.add(str(root.name))
+        return {"@vocab": self.vocab}
+
+    def add_prefix(self, prefix: str) -> None:
+        if prefix not in self.namespaces:
+            logger.warning(f"Unrecognized prefix: {prefix}")
+            self.namespaces[prefix] = f"http://example.org/UNKNOWN/{prefix}/"
+        self.emit_prefixes.add(prefix)
+
+    def slots(self) -> dict[str, tuple[str, SlotDefinition, str | None]]:
+        """
+        Returns each slot, including the attributes of each class, along with the term it is given in the context and the schema it belongs to.
+        Attributes are keyed by their class as well as their name, as `SchemaLoader` does.
+        """
+        slots = {
+            str(name): (str(slot.alias or name), slot, slot.from_schema)
+            for name, slot in self.sv.all_slots(attributes=False).items()
+        }
+        for cname, cls in self.sv.all_classes().items():
+            for attribute in cls.attributes.values():
+                slots[f"{camelcase(cname)}__{underscore(attribute.name)}"] = (str(attribute.alias or attribute.name), attribute, cls.from_schema)
+        return slots
+
+    def inherited(self, slot: SlotDefinition, name: str) -> dict[str, Any]:
+        """
+        Returns the metaslots of a slot that the context depends on, including those it inherits from its parent and mixins
+        """
+        values = {metaslot: getattr(slot, metaslot) for metaslot in INHERITED_SLOTS}
+        for parent in [slot.is_a, *slot.mixins]:
+            if parent is None or parent == name:
+                continue
+            parent_values = self.inherited(self.sv.get_slot(parent), parent)
+            for metaslot, value in values.items():
+                if value is None:
+                    values[metaslot] = parent_values[metaslot]
+        return values
+
+    def slot_uri(self, slot: SlotDefinition, term: str, from_schema: str | None) -> str:
+        if slot.slot_uri is not None:
+            return str(slot.slot_uri)
+        from_schema = str(from_schema or self.sv.schema.id)
+        return self.namespaces.uri_or_curie_for(self.schema_defaults.get(from_schema, sfx(from_schema)), underscore(term))
+
+    def range_type(self, range: str) -> str | None:
+        """
+        Returns the `@type` that the context gives a value with this range, or `None` if it doesn't need one
+        """
+        if range in self.sv.all_classes():
+            return "@id"
+        types = self.sv.all_types()
+        if range in types:
+            uri = self.type_uri(types[range])
+            expanded = self.namespaces.uri_for(uri)
+            if expanded == XSD.string:
+                return None
+            if expanded in URI_RANGES:
+                return "@id"
+            return uri
+        return None
+
+    def type_uri(self, type: TypeDefinition) -> str:
+        """
+        Returns the URI of a type, which may be inherited from the type it is derived from
+        """
+        while type.uri is None and type.typeof is not None:
+            type = self.sv.get_type(type.typeof)
+        return str(type.uri)
+
+    def slot_definition(self, slot: SlotDefinition, term: str, from_schema: str | None) -> str | dict[str, Any]:
+        """
+        Returns the context entry for a slot, like `ContextGenerator.visit_slot`
+        """
+        values = self.inherited(slot, str(slot.name))
+        if values["identifier"]:
+            return "@id"
+        definition: dict[str, Any] = {}
+        range = values["range"] or self.sv.schema.default_range or "string"
+        any_of_ranges = [alternative.range for alternative in slot.any_of]
+        classes = self.sv.all_classes()
+        has_class_range = range in classes or any(alternative in classes for alternative in any_of_ranges)
+        has_literal_range = any(alternative in self.sv.all_types() for alternative in any_of_ranges)
+        if has_class_range and has_literal_range:
+            # Literal values are only coerced if every literal alternative agrees on the type
+            coercions = {self.range_type(alternative) for alternative in any_of_ranges if alternative in self.sv.all_types()}
+            if len(coercions) == 1 and None not in coercions:
+                definition["@type"] = coercions.pop()
+        elif has_class_range:
+            definition["@type"] = "@id"
+        elif range in self.sv.all_enums():
+            vocab = self.enum_vocab(self.sv.get_enum(range))
+            if vocab is None:
+                definition["@context"] = ENUM_CONTEXT
+            else:
+                definition["@type"] = "@vocab"
+                definition["@context"] = {**ENUM_CONTEXT, "@vocab": vocab}
+            skos = self.namespaces.prefix_for(SKOS)
+            if not skos:
+                self.namespaces["skos"] = SKOS
+                skos = "skos"
+            self.emit_prefixes.add(skos)
+        else:
+            type_uri = self.range_type(range)
+            if type_uri is not None:
+                definition["@type"] = type_uri
+
+        uri = self.slot_uri(slot, term, from_schema)
+        self.element_id(definition, uri)
+        self.add_mappings(slot, [*([slot.slot_uri] if slot.slot_uri else []), *slot.mappings], uri)
+        return definition
+
+    def enum_vocab(self, enum: EnumDefinition) -> str | None:
+        """
+        Returns the namespace shared by every permissible value of an enum, if each value's text is the local part of its meaning.
+        Values of such an enum can be written as plain strings, which the context expands using this namespace.
+        """
+        if not enum.permissible_values:
+            return None
+        prefixes = set()
+        for text, value in enum.permissible_values.items():
+            if not value or not value.meaning or ":" not in str(value.meaning):
+                return None
+            prefix, local = str(value.meaning).split(":", 1)
+            if local != text:
+                return None
+            prefixes.add(prefix)
+        if len(prefixes) != 1:
+            return None
+        namespace = self.namespaces.get(prefixes.pop())
+        return str(namespace) if namespace else None
+
+    def class_definition(self, cls: ClassDefinition) -> dict[str, Any]:
+        """
+        Returns the context entry for a class, like `ContextGenerator.visit_class`.
+        Slots whose range the class overrides get a scoped context, if that changes their `@type`.
+        """
+        if cls.class_uri is None:
+            from_schema = str(cls.from_schema or self.sv.schema.id)
+            uri = self.namespaces.uri_or_curie_for(self.schema_defaults.get(from_schema, sfx(from_schema)), camelcase(cls.name))
+        else:
+            uri = str(cls.class_uri)
+        self.add_mappings(cls, [*cls.mappings], uri, exact=[*([cls.class_uri] if cls.class_uri else []), *cls.exact_mappings])
+        definition: dict[str, Any] = {}
+        self.element_id(definition, uri)
+
+        scoped: dict[str, Any] = {}
+        global_slots = self.sv.all_slots(attributes=False)
+        overrides = [
+            *((name, attribute.range) for name, attribute in cls.attributes.items()),
+            *((name, usage.range) for name, usage in cls.slot_usage.items()),
+        ]
+        for name, override in overrides:
+            if not override or name not in global_slots:
+                continue
+            slot = global_slots[name]
+            global_range = self.inherited(slot, name)["range"] or self.sv.schema.default_range or "string"
+            override_type = self.range_type(override)
+            if override_type == self.range_type(global_range):
+                continue
+            entry: dict[str, Any] = {}
+            self.element_id(entry, self.slot_uri(slot, str(slot.alias or slot.name), slot.from_schema))
+            if override_type is not None:
+                entry["@type"] = override_type
+            scoped[underscore(name)] = entry
+        if scoped:
+            definition["@context"] = scoped
+        return definition
+
+    def element_id(self, definition: dict[str, Any], uri: str) -> None:
+        """
+        Sets the `@id` of a class or slot, which is relative to `@vocab` if the element is in the default namespace
+        """
+        prefix, suffix = self.namespaces.prefix_suffix(uri)
+        is_default_namespace = prefix == self.vocab or prefix == self.namespaces.prefix_for(self.vocab)
+        if not prefix and not suffix:
+            definition["@id"] = uri
+        elif not prefix or is_default_namespace:
+            definition["@id"] = suffix
+        else:
+            definition["@id"] = f"{prefix}:{suffix}"
+        if prefix and not is_default_namespace:
+            self.add_prefix(prefix)
+
+    def add_mappings(self, element: ClassDefinition | SlotDefinition, mappings: list[str], uri: str, exact: list[str] | None = None) -> None:
+        """
+        Adds the prefixes of an element's mappings, and of its URI, like `Generator.add_mappings`
+        """
+        for prefix in element.id_prefixes:
+            self.add_prefix(prefix)
+        all_mappings = [
+            *mappings,
+            *element.related_mappings,
+            *element.close_mappings,
+            *element.narrow_mappings,
+            *element.broad_mappings,
+            *(element.exact_mappings if exact is None else exact),
+            uri,
+        ]
+        for mapping in map(str, all_mappings):
+            if "://" in mapping:
+                curie = self.namespaces.curie_for(mapping)
+                if curie is None:
+                    # `Generator.add_mappings` stops at the first mapping that isn't in a known namespace
+                    logger.warning(f"No namespace defined for URI: {mapping}")
+                    return
+                mapping = curie
+            if ":" not in mapping or len(mapping.split(":")) != 2:
+                raise ValueError(f"Definition {element.name} - unrecognized mapping: {mapping}")
+            prefix = mapping.split(":")[0]
+            if prefix:
+                self.add_prefix(prefix)
@@ -1,21 +1,28 @@
 from abc import abstractmethod, ABC
 from dataclasses import dataclass, fields
+from functools import cached_property
 from importlib.abc import Traversable
+from importlib.resources import files
 from pathlib import Path
-from typing import Any, Callable, ClassVar
+from io import BytesIO
+from typing import Any, Callable, ClassVar, Literal
+from zipfile import ZipFile
 
 from linkml._version import __version__
 from linkml.utils.generator import Generator
 import tempfile
-from mkdocs.commands.build import build
-from mkdocs.config import load_config
-from jinja2 import Environment, select_autoescape
-from shutil import copytree
+from jinja2 import Environment, FileSystemBytecodeCache, FunctionLoader, Template
+from markdown import Markdown
+from markupsafe import Markup
 from linkml_runtime import SchemaView
 from linkml_runtime.linkml_model import SchemaDefinition
-import os
 
-from proclaim.util import mandatory, description, domain, remove_newlines
+from proclaim.schema_context import SchemaContext
+from proclaim.timings import timed
+from proclaim.util import add_tree, move_tree, mandatory, description, domain, remove_newlines, run_forked
+
+#: Ways of converting the generated markdown into HTML
+Renderer = Literal["mkdocs", "direct"]
 
 @dataclass
 class MkDocsGenerator(Generator, ABC):
@@ -30,22 +37,76 @@ class MkDocsGenerator(Generator, ABC):
 
     site_name: str | None = None
 
+    context: SchemaContext | None = None
+    "Schema context shared with other generators. If not provided, one is created for this generator."
+
+    bytecode_cache_dir: Path | None = None
+    "Directory in which compiled templates are cached between runs. If `None`, templates are only cached in memory."
+
+    renderer: Renderer = "mkdocs"
+    """
+    How the markdown is converted to HTML.
+    `"mkdocs"` runs a full MkDocs build, with its theme, navigation and search.
+    `"direct"` converts each page using a lightweight layout, which is much faster for large sites.
+    """
+
+    layout_path: Traversable = files("proclaim.html") / "layout.jinja2"
+    "Page layout used by the direct renderer"
+
+    jobs: int = 1
+    "Number of worker processes used to render pages. They are forked once the schema context is warmed, so they share it. 1 renders every page in this process."
+
+    batch_size: int = 64
+    "Number of pages in each unit of work handed to a worker process"
+
+    archive: ZipFile | None = None
+    "If set, the markdown and HTML are written into this zip file rather than onto disk. The output directory is then a path within the archive."
+
     # Without this, the relative imports are broken
     uses_schemaloader: ClassVar[bool] = False
 
     def __post_init__(self):
         super().__post_init__()
+        if self.context is None:
+            self.context = SchemaContext(mandatory(self.schemaview, "Missing schema"))
+        else:
+            # Use the shared schema view, whose imports and derived queries may already be loaded
+            self.schemaview = self.context.sv
         if self.site_name is None and isinstance(self.schema, SchemaDefinition):
             self.site_name = self.schema.name
 
-    def to_markdown(self, template_path: Traversable, **kwargs: Any) -> str:
+    @cached_property
+    def template_sources(self) -> dict[str, Traversable]:
         """
-        Params:
-            template_path: Path to the Jinja2 template to render
-            **kwargs: Additional keyword arguments to pass to `template.render()`
+        Maps template names, as used by the Jinja2 environment, to the template files
         """
+        return {}
+
+    def load_template(self, name: str) -> tuple[str, str, Callable[[], bool]]:
+        """
+        Jinja2 loader for the templates in `template_sources`.
+        Templates on the filesystem are recompiled if their modification time changes.
+        """
+        template_path = self.template_sources[name]
+        if isinstance(template_path, Path):
+            mtime = template_path.stat().st_mtime_ns
+            return template_path.read_text(), str(template_path), lambda: template_path.stat().st_mtime_ns == mtime
+        return template_path.read_text(), name, lambda: True
+
+    @cached_property
+    def environment(self) -> Environment:
+        """
+        Jinja2 environment that compiles each template once, and then caches it
+        """
+        bytecode_cache = None
+        if self.bytecode_cache_dir is not None:
+            Path(self.bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(self.bytecode_cache_dir))
         environment = Environment(
-            autoescape=select_autoescape(),
+            loader=FunctionLoader(self.load_template),
+            bytecode_cache=bytecode_cache,
+            # Equivalent to `select_autoescape()`, which always escapes templates that have no file extension
+            autoescape=True,
             trim_blocks=True,
             keep_trailing_newline=False,
             lstrip_blocks=True,
@@ -53,16 +114,32 @@ class MkDocsGenerator(Generator, ABC):
         environment.globals.update(self.get_globals())
         environment.shared = True
         environment.filters.update(self.get_filters())
-        template = environment.from_string(
-            template_path.read_text()
-        )
-        return template.render(sv=self.schemaview, **kwargs)
+        return environment
+
+    def get_template(self, template_path: Traversable) -> Template:
+        """
+        Returns the compiled template, compiling it only if it isn't already cached
+        """
+        name = str(template_path)
+        self.template_sources[name] = template_path
+        return self.environment.get_template(name)
+
+    def to_markdown(self, template_path: Traversable, **kwargs: Any) -> str:
+        """
+        Params:
+            template_path: Path to the Jinja2 template to render
+            **kwargs: Additional keyword arguments to pass to `template.render()`
+        """
+        return self.get_template(template_path).render(sv=self.schemaview, **kwargs)
 
     def get_globals(self) -> dict[str, Any]:
         """
         Override this method to add additional global variables to the Jinja2 environment
         """
-        return {field.name: getattr(self, field.name) for field in fields(self)}
+        return {
+            **{field.name: getattr(self, field.name) for field in fields(self)},
+            "slot_table": mandatory(self.context, "Missing schema context").slot_table,
+        }
 
     def get_filters(self) -> dict[str, Callable]:
         """
@@ -81,6 +158,62 @@ class MkDocsGenerator(Generator, ABC):
         """
         output_path.write_text(self.to_markdown(template_path, **kwargs))
 
+    def build_html(self, markdown_dir: Path, html_dir: Path, *, config: dict = {}, dirty: bool = False) -> None:
+        """
+        Runs MkDocs to convert a directory of markdown into HTML
+
+        Params:
+            dirty: If true, only rebuild the pages whose markdown is newer than their HTML
+        """
+        # MkDocs is only loaded when it's used, because the direct renderer doesn't need it
+        from mkdocs.commands.build import build
+        from mkdocs.config import load_config
+
+        # An empty config file, so that MkDocs doesn't look for one in the working directory
+        with timed("mkdocs_build", output=html_dir):
+            build(load_config(BytesIO(b""), **config, site_name=self.site_name, markdown_extensions=["tables"], site_dir=str(html_dir), docs_dir=str(markdown_dir)), dirty=dirty)
+
+    def render_html(self, markdown_dir: Path, html_dir: Path, *, dirty: bool = False) -> None:
+        """
+        Converts a directory of markdown into HTML without MkDocs, using the same URL layout as MkDocs.
+        Each page is wrapped in the template at `layout_path`.
+
+        Params:
+            dirty: If true, only rebuild the pages whose markdown is newer than their HTML
+        """
+        converter = Markdown(extensions=["tables"])
+        layout = self.get_template(self.layout_path)
+
+        def render_page(markdown_path: Path) -> None:
+            # Use directory URLs, so that e.g. classes/Foo.md becomes classes/Foo/index.html
+            relative = markdown_path.relative_to(markdown_dir).with_suffix("")
+            if relative.name != "index":
+                relative = relative / "index"
+            html_path = html_dir / relative.with_suffix(".html")
+            if dirty and html_path.exists() and html_path.stat().st_mtime_ns >= markdown_path.stat().st_mtime_ns:
+                return
+
+            source = markdown_path.read_text()
+            title = next((line[2:].strip() for line in source.splitlines() if line.startswith("# ")), None)
+            html_path.parent.mkdir(parents=True, exist_ok=True)
+            html_path.write_text(layout.render(
+                title=title,
+                root="../" * (len(relative.parts) - 1) or "./",
+                content=Markup(converter.reset().convert(source)),
+            ))
+
+        with timed("render_html", output=html_dir):
+            run_forked(render_page, sorted(markdown_dir.rglob("*.md")), self.jobs, self.batch_size)
+
+    def write_html(self, markdown_dir: Path, html_dir: Path, *, config: dict = {}, dirty: bool = False) -> None:
+        """
+        Converts a directory of markdown into HTML using the selected `renderer`
+        """
+        if self.renderer == "direct":
+            self.render_html(markdown_dir, html_dir, dirty=dirty)
+        else:
+            self.build_html(markdown_dir, html_dir, config=config, dirty=dirty)
+
     @abstractmethod
     def make_markdown(self, markdown_dir: Path, sv: SchemaView) -> None:
         """
@@ -94,31 +227,36 @@ class MkDocsGenerator(Generator, ABC):
         if sv is None:
             raise Exception("Missing schema")
 
-        # Build everything in a temporary directory first
-        # This lets the directory layout be more flexible than mkdocs would overwise allow
-        with tempfile.TemporaryDirectory() as _tmp:
-            tmp = Path(_tmp)
-            tmp_markdown_dir = tmp / "docs"
-            tmp_markdown_dir.mkdir()
-            tmp_html_dir = tmp / "site"
-
-            # Run the build
-            (tmp / "mkdocs.yml").touch()
-            self.make_markdown(tmp_markdown_dir, sv)
-            # This can use contextlib.chdir once 3.10 is dropped
-            wd = os.getcwd()
-            os.chdir(tmp)
-            build(load_config(**config, site_name=self.site_name, markdown_extensions=["tables"], site_dir=str(tmp_html_dir), docs_dir=str(tmp_markdown_dir)))
-            os.chdir(wd)
-
-            # Setup result directory
-            root = Path(directory)
-            root.mkdir(parents=True, exist_ok=True)
-            markdown_dir = Path(directory) / self.markdown_dir
-            # markdown_dir.mkdir(exist_ok=True)
-            html_dir = Path(directory) / self.html_dir
-            # html_dir.mkdir(exist_ok=True)
-
-            # Copy results
-            copytree(tmp_markdown_dir, markdown_dir, dirs_exist_ok=True)
-            copytree(tmp_html_dir, html_dir, dirs_exist_ok=True)
+        if self.archive is not None:
+            with tempfile.TemporaryDirectory() as tmp:
+                tmp_markdown_dir, tmp_html_dir = self.build_site(Path(tmp), sv, config)
+                with timed("archive"):
+                    add_tree(self.archive, tmp_markdown_dir, Path(directory) / self.markdown_dir)
+                    add_tree(self.archive, tmp_html_dir, Path(directory) / self.html_dir)
+            return
+
+        # Build everything in a staging directory first, since MkDocs doesn't allow the markdown and HTML
+        # to share a directory, or its HTML to be merged into a directory that has other files.
+        # The staging directory is inside the output directory, so that its results can be renamed into place rather than copied.
+        root = Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=root, prefix=".staging-") as tmp:
+            tmp_markdown_dir, tmp_html_dir = self.build_site(Path(tmp), sv, config)
+            with timed("move"):
+                move_tree(tmp_markdown_dir, root / self.markdown_dir)
+                move_tree(tmp_html_dir, root / self.html_dir)
+
+    def build_site(self, staging_dir: Path, sv: SchemaView, config: dict) -> tuple[Path, Path]:
+        """
+        Writes the markdown and HTML into a staging directory
+
+        Returns:
+            The markdown and HTML directories within `staging_dir`
+        """
+        markdown_dir = staging_dir / "docs"
+        markdown_dir.mkdir()
+        html_dir = staging_dir / "site"
+        with timed("make_markdown", output=markdown_dir):
+            self.make_markdown(markdown_dir, sv)
+        self.write_html(markdown_dir, html_dir, config=config)
+        return markdown_dir, html_dir
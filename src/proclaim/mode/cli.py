@@ -0,0 +1,50 @@
+"""
+Entry point of `proclaim-mode`, which loads the generator only once the command runs
+"""
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any
+
+import click
+
+from proclaim.cli import server_options, shared_arguments, version_option
+from proclaim.profiling import WHOLE_RUN, profile_options, profiled
+
+@shared_arguments(["crateo-mode"])
+@click.command(name="crato-mode")
+@click.option(
+    "--mode-template",
+    help=f"JSON mode file to merge with the generated output",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Write the mode file without indentation",
+)
+@profile_options(["make_mode"])
+@server_options
+@version_option
+def cli(yamlfile: str, mode_template: Path, compact: bool, profile_stage: str | None, profile_output: Path | None, profile_top: int, use_server: bool, socket_path: Path, **kwargs: Any):
+    if use_server and profile_stage is None and kwargs.get("importmap") is None:
+        from proclaim.server import run_on_server
+        options = dict(schema=yamlfile, base_dir=str(Path(yamlfile).parent), mode_file_template=mode_template, compact=compact)
+        response = run_on_server(socket_path, "mode", options)
+        if response is not None:
+            print(response["output"])
+            return
+
+    def profile(name: str):
+        if name != profile_stage:
+            return nullcontext()
+        return profiled(profile_output or Path(f"{name}.prof"), top=profile_top)
+
+    # The whole run includes importing the generator and loading the schema, whereas make_mode only covers converting and writing it
+    with profile(WHOLE_RUN):
+        from proclaim.mode.generator import RoCrateModeGenerator
+        generator = RoCrateModeGenerator(yamlfile, mode_file_template=mode_template, compact=compact, **kwargs)
+        with profile("make_mode"):
+            output = generator.serialize(**kwargs)
+    print(output)
+
+if __name__ == "__main__":
+    cli()
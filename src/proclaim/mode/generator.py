@@ -1,21 +1,22 @@
 from dataclasses import dataclass
+from functools import cached_property
+from io import StringIO
 from pathlib import Path
-from typing import Any, ClassVar, cast, TypeVar
+from typing import ClassVar, Iterator, Mapping, TextIO, TypeVar
 from packaging.version import parse as parse_version
-from linkml_runtime.linkml_model.meta import ElementName
 
-import click
 from linkml_runtime.linkml_model.meta import (
     ClassDefinition,
+    ClassDefinitionName,
+    SlotDefinitionName,
 )
-from linkml_runtime.utils.schemaview import SchemaView
 
-from linkml._version import __version__
-from linkml.utils.generator import Generator, shared_arguments
-from linkml.generators.jsonldcontextgen import ContextGenerator
-import json
+from linkml.utils.generator import Generator
 
 import proclaim.mode.schema as mode
+from proclaim.mode.cli import cli
+from proclaim.schema_context import SchemaContext
+from proclaim.util import JsonObject, write_json
 
 T = TypeVar("T")
 def fail_unless(x: T | None, msg: str) -> T:
@@ -23,25 +24,27 @@ def fail_unless(x: T | None, msg: str) -> T:
         raise ValueError(f"{msg} must be specified in the LinkML schema to be compatible with the mode file generator")
     return x
 
-def convert_class(cls: ClassDefinition, sv: SchemaView) -> mode.Class:
+def convert_class(cls: ClassDefinition, context: SchemaContext, inputs: Mapping[str, mode.Input]) -> mode.Class:
     """
     Converts a LinkML class definition into a mode file class definition
+
+    Params:
+        inputs: Input definitions of the slots, as returned by `convert_slot`, which are shared between classes
     """
-    return mode.Class(
-        id=sv.get_uri(cast(ElementName, cls.name), expand=True),
-        subClassOf=[str(cls) for cls in sv.class_parents(cls.name)],
-        hasSubclass=[str(cls) for cls in sv.class_children(cls.name)],
-        # At this stage we have no inputs, but this will get filled in by visit_class_slot
-        inputs = [ convert_slot(slot_name, sv) for slot_name in sv.class_slots(cls.name) ]
+    return mode.Class.trusted(
+        id=context.uris[cls.name],
+        subClassOf=[str(cls) for cls in context.class_parents[cls.name]],
+        hasSubclass=[str(cls) for cls in context.class_children[cls.name]],
+        inputs = [ inputs[slot_name] for slot_name in context.class_slots[cls.name] ]
     )
 
-def convert_slot(slot_name: str, sv: SchemaView) -> mode.Input:
+def convert_slot(slot_name: str, context: SchemaContext) -> mode.Input:
     """
     Converts a LinkML slot into a mode file input definition
     """
     from linkml_runtime.utils.metamodelcore import Bool
 
-    slot = sv.get_slot(slot_name)
+    slot = context.sv.get_slot(slot_name)
 
     if slot.slot_uri is None:
         raise Exception("Each slot must have an IRI in order to convert to a mode file")
@@ -53,8 +56,8 @@ def convert_slot(slot_name: str, sv: SchemaView) -> mode.Input:
         elif isinstance(slot.comments, list):
             description = "\n".join(slot.comments)
 
-    return mode.Input(
-        id=sv.get_uri(cast(ElementName, slot.name), expand=True),
+    return mode.Input.trusted(
+        id=context.uris[slot.name],
         name=slot.name,
         label=slot.name,
         help=fail_unless(description, "slot description or comments"),
@@ -77,40 +80,74 @@ class RoCrateModeGenerator(Generator):
 
     mode_file_template: Path | None = None
 
-    def make_mode(self) -> mode.ModeFile:
-        sv = SchemaView(self.schema)
+    context: SchemaContext | None = None
+    "Schema context shared with other generators. If not provided, one is created for this generator."
+
+    compact: bool = False
+    "If true, the mode file is written without indentation"
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.context is None:
+            self.context = SchemaContext(fail_unless(self.schemaview, "schema"))
+        else:
+            # Use the shared schema view, whose imports and derived queries may already be loaded
+            self.schemaview = self.context.sv
+
+    @cached_property
+    def inputs(self) -> dict[SlotDefinitionName, mode.Input]:
+        """
+        Maps each slot used by a local class to its input definition.
+        Each slot is only converted once, however many classes use it.
+        """
+        context = fail_unless(self.context, "schema")
+        slot_names = dict.fromkeys(sname for snames in context.class_slots.values() for sname in snames)
+        return {sname: convert_slot(sname, context) for sname in slot_names}
+
+    def iter_classes(self) -> Iterator[tuple[ClassDefinitionName, mode.Class]]:
+        """
+        Converts every local class, in schema order
+        """
+        context = fail_unless(self.context, "schema")
+        inputs = self.inputs
+        for cname, cls in context.classes.items():
+            yield cname, convert_class(cls, context, inputs)
+
+    def make_metadata(self) -> mode.Metadata:
+        sv = fail_unless(self.context, "schema").sv
         # parse version
         version = parse_version(fail_unless(sv.schema.version, "version"))
-        return mode.ModeFile(
-            metadata=mode.Metadata(
-                name=fail_unless(sv.schema.name, "name"),
-                description=fail_unless(sv.schema.description, "description"),
-                # Approximate the version as a float, e.g. 1.2.3 -> 1.23
-                version=float(f"{version.major}.{version.minor}{version.micro}"),
-                license=fail_unless(sv.schema.license, "license"),
-                author=fail_unless(sv.schema.created_by, "created_by"),
-            ),
-            classes={
-                key: convert_class(value, sv) for key, value in sv.all_classes(imports=False).items()
-            },
-            # We don't pass the schema itself in, because ContextGenerator uses the old schema loader
-            # which doesn't understand relative imports properly unless we give it the absolute
-            # file path
-            context=json.loads(ContextGenerator(schema=sv.schema.source_file).serialize())
+        return mode.Metadata.trusted(
+            name=fail_unless(sv.schema.name, "name"),
+            description=fail_unless(sv.schema.description, "description"),
+            # Approximate the version as a float, e.g. 1.2.3 -> 1.23
+            version=float(f"{version.major}.{version.minor}{version.micro}"),
+            license=fail_unless(sv.schema.license, "license"),
+            author=fail_unless(sv.schema.created_by, "created_by"),
         )
 
-    def serialize(self, **kwargs) -> str:
-        return self.make_mode().model_dump_json(indent=4)
+    def make_mode(self) -> mode.ModeFile:
+        return mode.ModeFile.trusted(
+            metadata=self.make_metadata(),
+            classes=dict(self.iter_classes()),
+            context=fail_unless(self.context, "schema").jsonld_context
+        )
 
-@shared_arguments(RoCrateModeGenerator)
-@click.command(name="crato-mode")
-@click.option(
-    "--mode-template",
-    help=f"JSON mode file to merge with the generated output",
-)
-@click.version_option(__version__, "-V", "--version")
-def cli(yamlfile: str, mode_template: Path, **kwargs: Any):
-    print(RoCrateModeGenerator(yamlfile, mode_file_template=mode_template, **kwargs).serialize(**kwargs))
+    def write(self, file: TextIO) -> None:
+        """
+        Writes the mode file as JSON.
+        Unlike `make_mode()`, the classes are converted and written one at a time, so the whole mode file is never held in memory.
+        """
+        write_json(file, JsonObject([
+            ("metadata", self.make_metadata().model_dump(mode="json")),
+            ("classes", JsonObject((cname, cls.model_dump(mode="json")) for cname, cls in self.iter_classes())),
+            ("context", fail_unless(self.context, "schema").jsonld_context),
+        ]), indent=None if self.compact else 4)
+
+    def serialize(self, **kwargs) -> str:
+        output = StringIO()
+        self.write(output)
+        return output.getvalue()
 
 if __name__ == "__main__":
     cli()
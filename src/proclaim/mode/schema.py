@@ -1,20 +1,31 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, TypeAlias, Union
+from typing import Any, Dict, List, Optional, TypeAlias, Union
 from typing_extensions import Self, Annotated
 
-from pydantic import BaseModel, Field, StringConstraints, model_serializer
+from pydantic import BaseModel, Field, StringConstraints
 
 
 class SkipNullBase(BaseModel):
-    @model_serializer(mode="wrap")
-    def skip_null(self, handler: Callable[[Self], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Serialization of these models skips keys with None values.
+    This results in cleaner JSON but also satisfies the Mode JSON schema that doesn't allow null but allows missing keys.
+    The keys are dropped by pydantic while it serializes the whole tree of models, rather than by a separate serializer for each model.
+    """
+    @classmethod
+    def trusted(cls, **data: Any) -> Self:
         """
-        Modify the result of serialization to skip keys with None values.
-        This results in cleaner JSON but also satisfies the Mode JSON schema that doesn't allow null but allows missing keys.
+        Creates a model from data that is already known to be valid, such as data generated by proclaim itself, without validating it.
+        Nested models must already be model instances.
         """
-        return {k: v for k, v in handler(self).items() if v is not None}
+        return cls.model_construct(**data)
+
+    def model_dump(self, *, exclude_none: bool = True, **kwargs: Any) -> Dict[str, Any]:
+        return super().model_dump(exclude_none=exclude_none, **kwargs)
+
+    def model_dump_json(self, *, exclude_none: bool = True, **kwargs: Any) -> str:
+        return super().model_dump_json(exclude_none=exclude_none, **kwargs)
 
 
 class Metadata(SkipNullBase):
@@ -0,0 +1,10 @@
+"""
+Default locations of proclaim's files, which the command-line entry points need before any generator is loaded
+"""
+from pathlib import Path
+import os
+
+#: Where the cache lives unless otherwise specified
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "proclaim"
+#: Socket on which `proclaim-serve` listens unless otherwise specified
+DEFAULT_SOCKET = DEFAULT_CACHE_DIR / "server.sock"
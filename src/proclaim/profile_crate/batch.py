@@ -0,0 +1,159 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from glob import glob
+from logging import getLogger
+from pathlib import Path
+from time import perf_counter
+from typing import Any, TextIO
+import sys
+
+from proclaim.profile_crate.generator import ProfileCrateGenerator
+from proclaim.schema_cache import CachedSchemaView, SchemaCache
+
+logger = getLogger(__name__)
+
+#: Imports loaded by this worker process, which are shared by every profile that it builds
+worker_cache: SchemaCache | None = None
+
+def init_worker(cache_dir: Path | None) -> None:
+    global worker_cache
+    worker_cache = SchemaCache(cache_dir)
+
+def read_batch(batch: str) -> list[Path]:
+    """
+    Returns the schemas to build.
+
+    Params:
+        batch: Either a file that lists schemas, one per line, or a glob pattern such as `profiles/*/schema.yaml`.
+            The lines of the file can also be glob patterns, which are relative to the file. Blank lines and lines starting with `#` are ignored.
+    """
+    path = Path(batch)
+    if path.is_file():
+        lines = [line.strip() for line in path.read_text().splitlines()]
+        patterns = [str(path.parent / line) for line in lines if line and not line.startswith("#")]
+    else:
+        patterns = [batch]
+    schemas = []
+    for pattern in patterns:
+        matches = sorted(glob(pattern, recursive=True))
+        if not matches:
+            raise ValueError(f"No schemas match {pattern}")
+        schemas += [Path(match) for match in matches]
+    # The same schema may be matched by more than one pattern
+    return list(dict.fromkeys(schemas))
+
+@dataclass
+class ProfileResult:
+    """
+    Outcome of building one profile in a batch
+    """
+    schema: Path
+    directory: Path
+    "Output directory of the profile crate"
+    seconds: float
+    error: str | None = None
+    "Why the build failed, or `None` if it succeeded"
+
+def build_profile(generator_args: dict[str, Any], schema: Path, directory: Path, schema_cache: SchemaCache | None = None) -> ProfileResult:
+    """
+    Builds a single profile.
+    Errors are returned rather than raised, so that one broken schema doesn't stop the rest of the batch.
+
+    Params:
+        schema_cache: Cache of the imports shared between profiles. Defaults to the cache of this worker process.
+    """
+    start = perf_counter()
+    try:
+        ProfileCrateGenerator(schema=str(schema), base_dir=str(schema.parent), schema_cache=schema_cache or worker_cache, **generator_args).serialize(str(directory))
+    except Exception as e:
+        logger.exception(f"Failed to build {schema}")
+        return ProfileResult(schema, directory, perf_counter() - start, f"{type(e).__name__}: {e}")
+    return ProfileResult(schema, directory, perf_counter() - start)
+
+@dataclass
+class BatchBuild:
+    """
+    Builds many profile crates, sharing their imports and caches.
+    Each profile is built by one worker, so that profiles are built in parallel rather than stages.
+    """
+    schemas: list[Path]
+    output_dir: Path
+    "Each profile is written to a subdirectory of this, named after its schema file"
+    generator_args: dict[str, Any] = field(default_factory=dict)
+    "Keyword arguments used to create the `ProfileCrateGenerator` of every profile, apart from its schema"
+    jobs: int = 1
+    "Number of profiles built at once, each in its own worker process. 1 builds every profile in this process."
+    timings: Path | None = None
+    "If set, the timings of each profile are written to a file named after this one and the profile, e.g. `timings-process_run.json`"
+
+    @property
+    def cache_dir(self) -> Path | None:
+        cache_dir = self.generator_args.get("cache_dir")
+        return None if cache_dir is None else Path(cache_dir)
+
+    def directories(self) -> dict[Path, Path]:
+        """
+        Maps each schema to the directory its profile is written to
+        """
+        directories = {}
+        for schema in self.schemas:
+            directory = self.output_dir / schema.stem
+            if directory in directories.values():
+                raise ValueError(f"More than one schema would be written to {directory}")
+            directories[schema] = directory
+        return directories
+
+    def profile_args(self, schema: Path) -> dict[str, Any]:
+        """
+        Keyword arguments for the generator of one profile, which builds its stages serially, since the worker pool is already busy
+        """
+        args = {**self.generator_args, "jobs": 1}
+        if self.timings is not None:
+            args["timings"] = self.timings.with_name(f"{self.timings.stem}-{schema.stem}{self.timings.suffix}")
+        return args
+
+    def warm(self) -> None:
+        """
+        Loads the imports of every schema into the on-disk schema cache, so that the workers only need to unpickle them.
+        Without this, several workers would parse the shared imports at the same time.
+        """
+        cache = SchemaCache(self.cache_dir)
+        for schema in self.schemas:
+            try:
+                CachedSchemaView(str(schema), cache=cache).imports_closure()
+            except Exception:
+                # The error is reported when the profile is built
+                logger.debug(f"Failed to load the imports of {schema}", exc_info=True)
+
+    def run(self) -> list[ProfileResult]:
+        """
+        Builds every profile, and returns their results in the same order as `schemas`
+        """
+        directories = self.directories()
+        if self.jobs <= 1 or len(self.schemas) <= 1:
+            cache = SchemaCache(self.cache_dir)
+            return [build_profile(self.profile_args(schema), schema, directory, cache) for schema, directory in directories.items()]
+
+        if self.cache_dir is not None:
+            self.warm()
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=init_worker, initargs=(self.cache_dir,)) as pool:
+            futures = [pool.submit(build_profile, self.profile_args(schema), schema, directory) for schema, directory in directories.items()]
+            return [future.result() for future in futures]
+
+def print_summary(results: list[ProfileResult], file: TextIO | None = None) -> None:
+    """
+    Prints the time taken to build each profile, followed by the reasons that any of them failed
+
+    Params:
+        file: Where the summary is printed. If `None`, this is stdout.
+    """
+    if file is None:
+        file = sys.stdout
+    width = max([len("profile"), *(len(str(result.schema)) for result in results)])
+    print(f"{'profile':<{width}}  {'status':<6}  {'seconds':>8}", file=file)
+    for result in results:
+        print(f"{str(result.schema):<{width}}  {'failed' if result.error else 'ok':<6}  {result.seconds:>8.2f}", file=file)
+    failures = [result for result in results if result.error is not None]
+    print(f"Built {len(results) - len(failures)} of {len(results)} profiles in {sum(result.seconds for result in results):.2f}s of build time", file=file)
+    for result in failures:
+        print(f"{result.schema}: {result.error}", file=file)
@@ -0,0 +1,146 @@
+"""
+Entry point of `proclaim-profile`, which loads the generator only once the command runs
+"""
+from pathlib import Path
+from typing import Any
+
+import click
+
+from proclaim.cli import server_options, shared_arguments, version_option
+from proclaim.paths import DEFAULT_CACHE_DIR
+from proclaim.profiling import profile_options
+
+#: Stages of `ProfileCrateGenerator` that can be profiled on their own
+STAGES = ["make_vocab", "make_shacl", "make_mode", "make_linkml", "make_docs"]
+
+@shared_arguments(["rocrate-profile"], required=False)
+@click.command(name="rocrate-profile")
+@version_option
+@click.option(
+    "--output-dir",
+    help=f"Directory into which the RO-Crate Profile will be written",
+)
+@click.option(
+    "--output-zip",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Zip file into which the RO-Crate Profile will be written, instead of a directory. Each artifact is written straight into the zip file.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of worker processes used to build the profile artifacts in parallel, and to render the vocabulary pages",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=DEFAULT_CACHE_DIR,
+    show_default=True,
+    help="Directory in which parsed imports are cached between runs",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Parse all imports from scratch, without reading or writing the cache",
+)
+@click.option(
+    "--incremental/--full",
+    default=False,
+    show_default=True,
+    help="Skip the stages whose inputs haven't changed since the previous build into the same output directory. This needs the cache.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="After building, keep running and update the vocabulary whenever the schema or templates change",
+)
+@click.option(
+    "--renderer",
+    type=click.Choice(["mkdocs", "direct"]),
+    default="mkdocs",
+    show_default=True,
+    help="Build the HTML pages with MkDocs, or render them directly with a lightweight layout, which is much faster",
+)
+@click.option(
+    "--prune-shapes/--all-shapes",
+    default=False,
+    show_default=True,
+    help="Only include SHACL shapes for the schema's own classes and the imported classes that they refer to, which makes validation much faster",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Write mode.json and ro-crate-metadata.json without indentation",
+)
+@click.option(
+    "--merged-schema/--no-merged-schema",
+    default=True,
+    show_default=True,
+    help="Include a copy of the schema with all of its imports merged into it",
+)
+@click.option(
+    "--timings",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="JSON file to which the time, CPU time, memory and output size of each stage are written",
+)
+@click.option(
+    "--batch",
+    help="Build many profiles, listed one per line in this file, or matching this glob pattern, instead of YAMLFILE. Each profile is written to a subdirectory of the output directory, named after its schema, and --jobs profiles are built at once.",
+)
+@profile_options(STAGES)
+@server_options
+def cli(yamlfile: Path | None, batch: str | None, output_dir: Path | None, output_zip: Path | None, jobs: int, cache_dir: Path, no_cache: bool, incremental: bool, watch: bool, renderer: str, prune_shapes: bool, compact: bool, merged_schema: bool, timings: Path | None, profile_stage: str | None, profile_output: Path | None, profile_top: int, use_server: bool, socket_path: Path, **kwargs: Any):
+    # getLogger("linkml.utils.generator").setLevel("ERROR")
+    if (yamlfile is None) == (batch is None):
+        raise click.UsageError("Give either a schema or --batch")
+    generator_args = dict(
+        cache_dir=None if no_cache else cache_dir,
+        incremental=incremental,
+        renderer=renderer,
+        prune_shapes=prune_shapes,
+        compact=compact,
+        merge_schema=merged_schema,
+        profile_stage=profile_stage,
+        profile_output=profile_output,
+        profile_top=profile_top,
+    )
+    if batch is not None:
+        if watch or profile_stage is not None or output_zip is not None:
+            raise click.UsageError("--batch can't be used with --watch, --profile-stage or --output-zip")
+        if output_dir is None:
+            raise click.UsageError("--batch needs --output-dir")
+        from proclaim.profile_crate.batch import BatchBuild, print_summary, read_batch
+        try:
+            build = BatchBuild(read_batch(batch), Path(output_dir), generator_args, jobs=jobs, timings=timings)
+            # Checks that no two profiles would be written to the same directory
+            build.directories()
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        results = build.run()
+        print_summary(results)
+        if any(result.error is not None for result in results):
+            raise SystemExit(1)
+        return
+
+    if (output_dir is None) == (output_zip is None):
+        raise click.UsageError("Give either --output-dir or --output-zip")
+    generator_args.update(schema=str(yamlfile), base_dir=str(Path(yamlfile).parent), jobs=jobs, timings=timings, output_zip=output_zip)
+    if watch:
+        if output_zip is not None:
+            raise click.UsageError("--watch can't be used with --output-zip")
+        from proclaim.profile_crate.watch import ProfileWatcher
+        watcher = ProfileWatcher(generator_args, Path(output_dir))
+        watcher.generator.serialize(str(output_dir), **kwargs)
+        watcher.watch()
+    else:
+        if use_server and profile_stage is None and kwargs.get("importmap") is None:
+            from proclaim.server import run_on_server
+            if run_on_server(socket_path, "profile", generator_args, output_dir=None if output_dir is None else str(Path(output_dir).resolve())) is not None:
+                return
+        from proclaim.profile_crate.generator import ProfileCrateGenerator
+        ProfileCrateGenerator(**generator_args).serialize(None if output_dir is None else str(output_dir), **kwargs)
+
+if __name__ == "__main__":
+    cli()
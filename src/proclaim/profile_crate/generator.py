@@ -1,25 +1,44 @@
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from dataclasses import dataclass, field
+from functools import cached_property
+from importlib.abc import Traversable
+from importlib.resources import files
 from pathlib import Path
-from typing import Any, Callable, ClassVar
+from io import TextIOWrapper
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, TextIO
+from zipfile import ZIP_DEFLATED, ZipFile
 
-import click
+from linkml_runtime import __version__ as linkml_runtime_version
 from linkml_runtime.utils.schemaview import SchemaView
 from linkml_runtime.dumpers.yaml_dumper import YAMLDumper
 
-from linkml._version import __version__
-from linkml.utils.generator import Generator, shared_arguments
-from linkml.generators.shaclgen import ShaclGenerator
-from proclaim.html.generator import ProfileHtmlGenerator
+from linkml.utils.generator import Generator
 from rdflib import Graph, Literal, Namespace, PROF, URIRef, BNode
-from proclaim.mode.generator import RoCrateModeGenerator
-from proclaim.vocabulary import VocabularyHtmlGenerator
+from rdflib.plugins.serializers.jsonld import Converter
+from rdflib.plugins.shared.jsonld.context import Context
 from rdfcrate import AttachedCrate, uris, spec_version
-from shutil import copy
-from typing import TypeVar, ParamSpec
+from shutil import copy, rmtree
+from contextlib import AbstractContextManager, nullcontext
+import json
+import os
+import tempfile
+from typing import Concatenate, TypeVar, ParamSpec
+from functools import wraps
 
-from proclaim.util import mandatory
+from proclaim.profile_crate.cli import cli
+from proclaim.profiling import WHOLE_RUN, profiled
+from proclaim.profile_crate.manifest import BuildManifest, Triple, hash_bytes, hash_file, proclaim_version
+from proclaim.schema_cache import CachedSchemaView, SchemaCache
+from proclaim.schema_context import SchemaContext
+from proclaim.timings import Step, add_steps, measure_outputs, measuring_outputs, timed
+from proclaim.util import JsonArray, JsonObject, clone_file, mandatory, write_json
 from logging import getLogger
 
+if TYPE_CHECKING:
+    # The HTML generators, and the templating libraries they use, are only loaded by the stages that render HTML
+    from proclaim.mkdocs_generator import Renderer
+
 logger = getLogger(__name__)
 
 #: HTTP version of Schema.org
@@ -28,15 +47,44 @@ PROF_ROLES = Namespace("http://www.w3.org/ns/dx/prof/role/")
 
 Ret = TypeVar("Ret")
 Params = ParamSpec("Params")
-Func = Callable[Params, Ret]
-def log_start_end(func: Func) -> Func:
-    def wrapper(*args: Params.args, **kwargs: Params.kwargs) -> Ret:
+Stage = Callable[Concatenate["ProfileCrateGenerator", Path, Params], Ret]
+def log_start_end(func: Stage) -> Stage:
+    """
+    Logs the start and end of a stage, and records its resources, and the size of its output, as a step of the current build
+    """
+    @wraps(func)
+    def wrapper(self: "ProfileCrateGenerator", directory: Path, *args: Params.args, **kwargs: Params.kwargs) -> Ret:
+        output = self.stage_outputs.get(func.__name__)
         logger.info(f"Starting {func.__name__}")
-        result = func(*args, **kwargs)
-        logger.info(f"Finished {func.__name__}")
+        with timed(func.__name__, output=None if output is None else directory / output) as step, self.profile(func.__name__):
+            result = func(self, directory, *args, **kwargs)
+        logger.info(f"Finished {func.__name__} in {step.wall_seconds:.2f}s")
         return result
     return wrapper
 
+class NodeMap(dict):
+    """
+    The map from node IDs to JSON-LD nodes that rdflib's `Converter` fills in.
+    It remembers which IDs have been converted, but only keeps each node until it is taken to be written.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.pending: list[tuple[str, dict[str, Any]]] = []
+
+    def __setitem__(self, key: str, node: dict[str, Any]) -> None:
+        if key not in self:
+            self.pending.append((key, node))
+        super().__setitem__(key, node)
+
+    def take(self) -> list[dict[str, Any]]:
+        """
+        Returns the nodes added since the last call, in the order they were added, and forgets their contents
+        """
+        taken, self.pending = self.pending, []
+        for key, _ in taken:
+            super().__setitem__(key, None)
+        return [node for _, node in taken]
+
 @dataclass
 class ProfileCrateGenerator(Generator):
     """"
@@ -48,16 +96,218 @@ class ProfileCrateGenerator(Generator):
     requires_metamodel: ClassVar[bool] = False
     directory_output: bool = True
 
+    #: Stages that only write their own artifacts, so can be run concurrently.
+    #: Their crate entities are always merged in this order, regardless of which stage finishes first.
+    independent_stages: ClassVar[list[str]] = ["make_vocab", "make_shacl", "make_mode", "make_linkml"]
+
+    jobs: int = 1
+    "Number of worker processes used to run the independent stages, and to render the vocabulary pages. 1 runs everything in this process."
+
+    #: Artifact written by each stage, relative to the output directory
+    stage_outputs: ClassVar[dict[str, str]] = {
+        "make_vocab": "vocabulary",
+        "make_shacl": "shapes.ttl",
+        "make_mode": "mode.json",
+        "make_linkml": "linkml",
+        "make_docs": "index.html",
+    }
+
+    #: Templates rendered by each stage, which are inputs to the stage along with the schema
+    stage_templates: ClassVar[dict[str, list[Traversable]]] = {
+        # `files("proclaim.vocabulary")` would import the vocabulary generator, which this module leaves to the stage
+        "make_vocab": [files("proclaim") / "vocabulary" / "property.jinja2", files("proclaim") / "vocabulary" / "class.jinja2", files("proclaim.html") / "layout.jinja2"],
+        "make_docs": [files("proclaim.html") / "profile.jinja2", files("proclaim.html") / "layout.jinja2"],
+    }
+
+    #: Fields of this generator that affect the output of each stage, which are inputs to the stage along with the schema
+    stage_options: ClassVar[dict[str, list[str]]] = {
+        "make_vocab": ["renderer"],
+        "make_shacl": ["prune_shapes"],
+        "make_mode": ["compact"],
+        "make_linkml": ["merge_schema"],
+        "make_docs": ["renderer"],
+    }
+
+    cache_dir: Path | None = None
+    "Directory in which parsed imports are cached between runs. If `None`, imports are parsed every time."
+
+    schema_cache: SchemaCache | None = None
+    "Cache used to load imports. This takes precedence over `cache_dir`, and lets several generators share loaded imports."
+
+    incremental: bool = False
+    "If true, skip stages whose inputs haven't changed since the previous build into the same output directory. This needs a schema cache directory, in which the build manifests are kept. A manifest that has been evicted from the cache makes the next build a full one."
+
+    renderer: "Renderer" = "mkdocs"
+    "How the vocabulary and profile page are converted to HTML. See `MkDocsGenerator.renderer`."
+
+    prune_shapes: bool = False
+    "If true, the SHACL shapes only cover the classes reachable from the schema's own classes. See `ProfileShaclGenerator.pruned`."
+
+    compact: bool = False
+    "If true, `mode.json` and `ro-crate-metadata.json` are written without indentation"
+
+    merge_schema: bool = True
+    "If true, the LinkML copies include `merged.yml`, which is the schema with all of its imports merged into it"
+
+    date_published: datetime | None = None
+    "Publication date of the profile crate. If `None`, this is the time at which the crate is built, so setting it makes rebuilds byte for byte identical."
+
+    timings: Path | None = None
+    "JSON file to which the time, CPU time, memory and output size of each stage, and of their sub-steps, are written"
+
+    profile_stage: str | None = None
+    "Stage to profile with cProfile, or `\"all\"` to profile the whole build. A profiled stage is always rebuilt, even if it is up to date."
+
+    profile_output: Path | None = None
+    "File to which the profile is written. If `None`, this is `<profile_stage>.prof` in the working directory."
+
+    profile_top: int = 20
+    "Number of functions in the printed profile summary"
+
+    output_zip: Path | None = None
+    "If set, the profile crate is written to this zip file, rather than to the directory passed to `serialize`"
+
+    archive: ZipFile | None = field(default=None, init=False, repr=False)
+    "The zip file being written while building into `output_zip`"
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.schema_cache is None and self.cache_dir is not None:
+            self.schema_cache = SchemaCache(Path(self.cache_dir))
+        if self.schema_cache is not None:
+            # Replace the default schema view with one that loads its imports through the cache
+            self.schemaview = CachedSchemaView(self.schema, cache=self.schema_cache, importmap=self.importmap, base_dir=self.base_dir)
+
     @property
     def sv(self) -> SchemaView:
         if self.schemaview is None:
             raise ValueError("Missing schemaview")
         return self.schemaview
 
+    @cached_property
+    def context(self) -> SchemaContext:
+        """
+        Schema context shared by all the generators used to build the profile
+        """
+        return SchemaContext(self.sv)
+
+    @property
+    def bytecode_cache_dir(self) -> Path | None:
+        """
+        Directory in which the compiled templates are cached, alongside the parsed imports
+        """
+        if self.schema_cache is None or self.schema_cache.directory is None:
+            return None
+        return self.schema_cache.directory / "jinja"
+
+    @cached_property
+    def schema_hashes(self) -> dict[str, str]:
+        """
+        Hashes of every schema in the import closure, keyed by schema name
+        """
+        hashes = {}
+        for schema_name in self.context.imports_closure:
+            schema = self.sv.schema_map[schema_name]
+            if schema.source_file is not None and Path(schema.source_file).is_file():
+                hashes[f"schema:{schema_name}"] = hash_file(Path(schema.source_file))
+            else:
+                hashes[f"schema:{schema_name}"] = hash_bytes(YAMLDumper().dumps(schema).encode())
+        return hashes
+
+    def stage_inputs(self, stage: str, manifest: BuildManifest) -> dict[str, str]:
+        """
+        Returns hashes of everything that determines the output of `stage`.
+        `make_docs` renders the crate graph, so its inputs also include what the other stages have recorded in `manifest`: their inputs, including options such as `compact`, and the triples they added.
+        """
+        inputs = {
+            "proclaim": proclaim_version(),
+            **self.schema_hashes,
+            **{f"template:{template.name}": hash_file(template) for template in self.stage_templates.get(stage, [])},
+            **{f"option:{option}": str(getattr(self, option)) for option in self.stage_options.get(stage, [])},
+        }
+        if stage == "make_docs":
+            for dependency in self.independent_stages:
+                inputs[f"stage:{dependency}"] = hash_bytes(json.dumps(manifest.stages[dependency].to_json(), sort_keys=True).encode())
+        return inputs
+
+    def manifest_path(self, directory: Path) -> Path | None:
+        """
+        Returns the file that records the previous incremental build into `directory`, or `None` if builds aren't incremental.
+        Manifests are kept in the schema cache, keyed by the output directory, so that they aren't published with the crate.
+        """
+        if not self.incremental:
+            return None
+        if self.schema_cache is None or self.schema_cache.directory is None:
+            logger.warning("Incremental builds need a schema cache directory, so every stage will be rebuilt")
+            return None
+        return self.schema_cache.directory / "manifests" / f"{hash_bytes(str(directory.resolve()).encode())}.json"
+
+    def is_current(self, stage: str, directory: Path, manifest: BuildManifest) -> bool:
+        """
+        Returns true if the output of `stage` from a previous build can be reused
+        """
+        return self.incremental and self.archive is None and stage != self.profile_stage and manifest.is_current(stage, self.stage_inputs(stage, manifest)) and (directory / self.stage_outputs[stage]).exists()
+
+    def profile(self, name: str) -> AbstractContextManager:
+        """
+        Returns a context manager that profiles the enclosed code if `name` is the stage being profiled, and otherwise does nothing
+        """
+        if name != self.profile_stage:
+            return nullcontext()
+        return profiled(Path(self.profile_output or f"{name}.prof"), top=self.profile_top)
+
+    def open_artifact(self, directory: Path, name: str) -> TextIO:
+        """
+        Opens an artifact for writing, either in the output directory, or as an entry of the zip file being built
+
+        Params:
+            name: Path of the artifact relative to the crate root
+        """
+        if self.archive is not None:
+            return TextIOWrapper(self.archive.open(name, "w"), encoding="utf-8")
+        return (directory / name).open("w")
+
+    def copy_artifact(self, directory: Path, source: Path, name: str) -> None:
+        """
+        Copies a file into the output directory, or into the zip file being built
+        """
+        if self.archive is not None:
+            self.archive.write(source, name)
+        else:
+            clone_file(source, directory / name)
+
+    def output_path(self, directory: Path, name: str) -> Path:
+        """
+        Returns where a generator that writes a directory tree should write it: a path in the output directory, or in the zip file being built
+        """
+        return Path(name) if self.archive is not None else directory / name
+
+    def descriptor(self, stage: str) -> BNode:
+        """
+        Identifier of the `ResourceDescriptor` that a stage adds to the crate.
+        Unlike a random blank node, this is the same in every build, whichever process ran the stage.
+        """
+        return BNode(f"{stage}-descriptor")
+
+    def record_stage(self, stage: str, directory: Path, crate: AttachedCrate) -> list[Triple]:
+        """
+        Runs a stage, and returns the triples that it added to the crate.
+        These are sorted, since the order in which the graph yields them depends on each process's hash seed.
+        """
+        output = directory / self.stage_outputs[stage]
+        if output.is_dir():
+            # Remove artifacts from previous builds, so that removed classes and slots don't leave stale pages
+            rmtree(output)
+        initial = set(crate.graph)
+        getattr(self, stage)(directory, crate)
+        return sorted(triple for triple in crate.graph if triple not in initial)
+
     @log_start_end
     def make_vocab(self, directory: Path, crate: AttachedCrate):
+        # Each stage imports its generator, so that stages that are skipped or run elsewhere don't pay for loading it
+        from proclaim.vocabulary import VocabularyHtmlGenerator
         vocab_dir = directory / "vocabulary"
-        VocabularyHtmlGenerator(schema=self.schema, site_name=f"{self.schema.name} Vocabulary").serialize(directory=vocab_dir)
+        VocabularyHtmlGenerator(schema=self.schema, context=self.context, bytecode_cache_dir=self.bytecode_cache_dir, renderer=self.renderer, jobs=self.jobs, site_name=f"{self.schema.name} Vocabulary", archive=self.archive).serialize(directory=self.output_path(directory, "vocabulary"))
         vocab = crate.register_dir(vocab_dir, attrs=[
             (uris.name, Literal("Custom Vocabulary")),
             (uris.description, Literal("Contains markdown and HTML subdirectories")),
@@ -68,65 +318,104 @@ class ProfileCrateGenerator(Generator):
         crate.register_dir(vocab_dir / "markdown", attrs=[
             (uris.name, Literal("Custom Vocabulary in markdown")),
         ])
-        crate.add_entity(BNode(), [PROF.ResourceDescriptor], attrs=[
+        crate.add_entity(self.descriptor("make_vocab"), [PROF.ResourceDescriptor], attrs=[
             (PROF.hasRole, PROF_ROLES["vocabulary"]),
             (PROF.hasArtifact, vocab)
         ])
 
     @log_start_end
     def make_shacl(self, directory: Path, crate: AttachedCrate):
-        logger.info("(this is fairly slow")
+        from proclaim.shacl.generator import ProfileShaclGenerator
         shacl_path = directory / "shapes.ttl"
-        shacl_path.write_text(ShaclGenerator(schema=self.schema, base_dir=str(Path(self.schema.source_file).parent)).serialize())
+        with timed("serialize_shapes"):
+            shapes = ProfileShaclGenerator(schema=self.schema, context=self.context, pruned=self.prune_shapes).serialize()
+        with self.open_artifact(directory, "shapes.ttl") as shacl_file:
+            shacl_file.write(shapes)
         shacl = crate.register_file(shacl_path, attrs=[
             (uris.name, Literal("SHACL Shapes")),
             (uris.description, Literal("Provide validation of compliant crates")),
             (uris.conformsTo, URIRef("https://www.w3.org/TR/shacl/"))
         ])
-        crate.add_entity(BNode(), [PROF.ResourceDescriptor], attrs=[
+        crate.add_entity(self.descriptor("make_shacl"), [PROF.ResourceDescriptor], attrs=[
             (PROF.hasRole, PROF_ROLES["validation"]),
             (PROF.hasArtifact, shacl)
         ])
 
+    @cached_property
+    def schema_key(self) -> str:
+        """
+        Hash of the entire import closure, which identifies the merged schema.
+        The linkml_runtime and proclaim versions are included too, because they determine how the schemas are merged and dumped.
+        """
+        versions = {"linkml_runtime": linkml_runtime_version, "proclaim": proclaim_version()}
+        return hash_bytes("\n".join(f"{name}={digest}" for name, digest in sorted({**self.schema_hashes, **versions}.items())).encode())
+
+    def merged_schema_yaml(self) -> str:
+        """
+        Returns the schema with all of its imports merged into it, as YAML.
+        If there is a schema cache directory, the result is cached there, keyed by the contents of the import closure.
+        """
+        if self.schema_cache is None or self.schema_cache.directory is None:
+            return YAMLDumper().dumps(self.context.merged_schema)
+        entry = self.schema_cache.directory / "merged" / f"{self.schema_key}.yml"
+        if entry.is_file():
+            logger.info("Loaded the merged schema from the schema cache")
+            # Mark the entry as recently used
+            entry.touch()
+            return entry.read_text()
+        merged = YAMLDumper().dumps(self.context.merged_schema)
+        self.schema_cache.store(entry, merged.encode())
+        return merged
+
     @log_start_end
     def make_linkml(self, directory: Path, crate: AttachedCrate):
         dumper = YAMLDumper()
         linkml_dir = directory / "linkml"
-        linkml_dir.mkdir()
+        if self.archive is None:
+            linkml_dir.mkdir(exist_ok=True)
         # Copy all LinkML source files to the directory
-        for schema_name in self.sv.imports_closure():
-            schema = self.sv.schema_map[schema_name]
+        with timed("copy_schemas"):
             # The imported schemas could have used relative paths or full URIs that can't be represented in a flat directory
             # We can only approximate this by taking the path that was used to import the schema, expanding the URI and taking the last element
             # e.g. linkml:types -> types.yml
             # e.g. './schemaorg_current' -> schemaorg_current.yml
-            schema_path = Path(self.sv.expand_curie(schema_name)).with_suffix(".yml").name
-            dumper.dump(schema, linkml_dir / schema_path)
-            # copy(schema.source_file, linkml_dir / schema_path)
-        # Make a combined schema
-        merged_schema_path = linkml_dir / "merged.yml"
-        merged_schema = SchemaView(self.sv.schema)
-        merged_schema.merge_imports()
-        dumper.dump(merged_schema.schema, str(merged_schema_path))
+            # If two imports have the same name, the last one is kept, since a zip file can't overwrite an entry
+            schema_paths = {
+                Path(self.sv.expand_curie(schema_name)).with_suffix(".yml").name: self.sv.schema_map[schema_name]
+                for schema_name in self.context.imports_closure
+            }
+            for schema_path, schema in schema_paths.items():
+                if schema.source_file is not None and Path(schema.source_file).is_file():
+                    # Copying the source is much faster than dumping the parsed schema, which would give the same YAML
+                    self.copy_artifact(directory, Path(schema.source_file), f"linkml/{schema_path}")
+                else:
+                    with self.open_artifact(directory, f"linkml/{schema_path}") as schema_file:
+                        schema_file.write(dumper.dumps(schema))
+        if self.merge_schema:
+            # Make a combined schema
+            with timed("merge_schema", output=linkml_dir / "merged.yml"), self.open_artifact(directory, "linkml/merged.yml") as merged_file:
+                merged_file.write(self.merged_schema_yaml())
         linkml = crate.register_dir(linkml_dir, attrs=[
             (uris.name, Literal("LinkML Schemas")),
             (uris.description, Literal("Contains copies of the LinkML schema(s) used to generate the profile."))
         ])
-        crate.add_entity(BNode(), [PROF.ResourceDescriptor], attrs=[
+        crate.add_entity(self.descriptor("make_linkml"), [PROF.ResourceDescriptor], attrs=[
             (PROF.hasRole, PROF_ROLES["schema"]),
             (PROF.hasArtifact, linkml)
         ])
 
     @log_start_end
     def make_mode(self, directory: Path, crate: AttachedCrate):
+        from proclaim.mode.generator import RoCrateModeGenerator
         logger.info(f"Writing Crate-O Mode File")
         mode_path = directory / "mode.json"
-        mode_path.write_text(RoCrateModeGenerator(schema=self.schema).serialize())
+        with self.open_artifact(directory, "mode.json") as mode_file:
+            RoCrateModeGenerator(schema=self.schema, context=self.context, compact=self.compact).write(mode_file)
         mode = crate.register_file(mode_path, attrs=[
             (uris.name, Literal("Crate-O Mode File")),
             (uris.description, Literal("Provides a schema that can power the Crate-O GUI editor"))
         ])
-        crate.add_entity(BNode(), [PROF.ResourceDescriptor], attrs=[
+        crate.add_entity(self.descriptor("make_mode"), [PROF.ResourceDescriptor], attrs=[
             (PROF.hasRole, PROF_ROLES["schema"]),
             (PROF.hasArtifact, mode)
         ])
@@ -134,23 +423,23 @@ class ProfileCrateGenerator(Generator):
 
     @log_start_end
     def make_docs(self, directory: Path, crate: AttachedCrate):
+        from proclaim.html.generator import ProfileHtmlGenerator
         # We have to document the index.html file before it's actually created
         # so that it appears in the docs
         index = URIRef("index.html")
         crate.graph.add((index, uris.name, Literal(f"Human readable profile description")))
         crate.graph.add((index, uris.description, Literal(f"Describes the profile in terms of classes and constraints, along with the profile crate's contents")))
-        crate.add_entity(BNode(), [PROF.ResourceDescriptor], attrs=[
+        crate.add_entity(self.descriptor("make_docs"), [PROF.ResourceDescriptor], attrs=[
             (uris.hasRole, PROF_ROLES["specification"]),
             (uris.hasArtifact, index)
         ])
-        ProfileHtmlGenerator(schema=self.schema, graph=crate.graph, html_dir=Path(""), markdown_dir=Path(""), site_name=f"{self.schema.name} RO-Crate Profile").serialize(directory=directory)
+        ProfileHtmlGenerator(schema=self.schema, context=self.context, bytecode_cache_dir=self.bytecode_cache_dir, renderer=self.renderer, graph=crate.graph, html_dir=Path(""), markdown_dir=Path(""), site_name=f"{self.schema.name} RO-Crate Profile", archive=self.archive).serialize(directory=self.output_path(directory, ""))
         index = crate.register_file("index.html")
 
-    def serialize(self, directory: str, **kwargs) -> None:
-        dir_path = Path(directory)
-        dir_path.mkdir(parents=True, exist_ok=True)
-
-        # Build up a crate as we create files
+    def make_crate(self, directory: Path) -> AttachedCrate:
+        """
+        Creates an empty crate rooted at `directory`, describing the profile itself
+        """
         crate = AttachedCrate(
             path=directory,
             name=mandatory(self.sv.schema.name, "A LinkML schema must have a `name` field to be converted to an RO-Crate Profile"),
@@ -158,33 +447,177 @@ class ProfileCrateGenerator(Generator):
             license=mandatory(self.sv.schema.license, "A LinkML schema must have a `license` field to be converted to an RO-Crate Profile"),
             version=spec_version.ROCrate1_2
         )
+        if self.date_published is not None:
+            root = crate.graph.value(crate.metadata_entity, uris.about)
+            crate.graph.set((root, uris.datePublished, Literal(self.date_published.isoformat())))
+        return crate
+
+    def write_metadata(self, crate: AttachedCrate) -> None:
+        """
+        Writes `ro-crate-metadata.json`.
+        Unlike `crate.write()`, each entity is converted to JSON-LD and written one at a time, so the whole document is never held in memory.
+        """
+        context_url = crate.version.context
+        converter = Converter(Context(context_url), use_native_types=False, use_rdf_type=False)
+        graph = crate.graph
+
+        def entities():
+            # Shared by every subject, as in `Converter.from_graph`, so that a blank node referenced from several entities is only written once
+            nodes = NodeMap()
+            # The same top level entities as the JSON-LD serializer: all IRIs, and blank nodes that aren't nested in another entity
+            for subject in sorted(set(graph.subjects())):
+                if isinstance(subject, URIRef) or not any(graph.subjects(None, subject)):
+                    converter.process_subject(graph, subject, nodes)
+                    yield from nodes.take()
 
-        self.make_vocab(dir_path, crate)
-        self.make_shacl(dir_path, crate)
-        self.make_mode(dir_path, crate)
-        self.make_linkml(dir_path, crate)
+        with self.open_artifact(crate.root, "ro-crate-metadata.json") as metadata_file:
+            write_json(metadata_file, JsonObject([
+                ("@context", context_url),
+                ("@graph", JsonArray(entities())),
+            ]), indent=None if self.compact else 2, sort_keys=True)
+
+    def worker_args(self) -> dict[str, Any]:
+        """
+        Keyword arguments that recreate this generator inside a worker process
+        """
+        return {
+            "schema": self.schema.source_file,
+            "base_dir": self.base_dir,
+            "importmap": self.importmap,
+            # The workers share the cache's directory, since the cache itself holds every loaded import in memory
+            "cache_dir": self.cache_dir if self.schema_cache is None else self.schema_cache.directory,
+            "incremental": self.incremental,
+            "renderer": self.renderer,
+            "jobs": self.jobs,
+            "prune_shapes": self.prune_shapes,
+            "compact": self.compact,
+            "merge_schema": self.merge_schema,
+            "date_published": self.date_published,
+            "profile_stage": self.profile_stage,
+            "profile_output": self.profile_output,
+            "profile_top": self.profile_top,
+        }
+
+    def run_stages(self, directory: Path, crate: AttachedCrate, manifest: BuildManifest) -> None:
+        """
+        Runs all the independent stages that are out of date, either in this process or in a process pool.
+        Up to date stages have their crate entities replayed from the manifest instead.
+        """
+        results: dict[str, list[Triple]] = {}
+        pending = []
+        for stage in self.independent_stages:
+            if self.is_current(stage, directory, manifest):
+                logger.info(f"Skipping {stage}, whose inputs are unchanged")
+                results[stage] = manifest.stages[stage].triples
+            else:
+                pending.append(stage)
+
+        # A zip file can only be written by one process
+        if self.jobs <= 1 or self.archive is not None or self.schema.source_file is None or len(pending) <= 1:
+            if self.jobs > 1 and self.schema.source_file is None:
+                logger.warning("Schemas without a source file can't be shared with worker processes, so the stages will run serially")
+            for stage in pending:
+                results[stage] = self.record_stage(stage, directory, self.make_crate(directory))
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                futures = {stage: pool.submit(run_stage, self.worker_args(), stage, directory, measure_outputs.get()) for stage in pending}
+                for stage, future in futures.items():
+                    results[stage], steps = future.result()
+                    add_steps(steps)
+
+        # Merge in stage order so that the crate is the same however the stages were run
+        for stage in self.independent_stages:
+            manifest.record(stage, self.stage_inputs(stage, manifest), results[stage])
+            for triple in results[stage]:
+                crate.graph.add(triple)
+
+    def serialize(self, directory: str | None = None, **kwargs) -> None:
+        """
+        Builds the profile crate in `directory`, or in `output_zip` if it is set, in which case `directory` isn't used
+        """
+        if self.profile_stage == WHOLE_RUN and self.jobs > 1:
+            logger.warning("The profile only covers this process, so it won't include the stages run by worker processes. Use --jobs 1 to profile everything.")
+        with measuring_outputs(self.timings is not None), timed("build") as build, self.profile(WHOLE_RUN):
+            if self.output_zip is None:
+                self.build(Path(mandatory(directory, "Missing output directory")))
+            else:
+                self.build_zip(Path(self.output_zip))
+        if self.timings is not None:
+            Path(self.timings).write_text(json.dumps(build.to_json(), indent=4))
+
+    def build_zip(self, zip_path: Path) -> None:
+        """
+        Builds the profile crate as a zip file, writing each artifact straight into its entry.
+        The crate is rooted at a staging directory, which is only written to by MkDocs while it renders the HTML.
+        The zip file is only replaced once it is complete.
+        """
+        zip_path.parent.mkdir(parents=True, exist_ok=True)
+        # Unlike `NamedTemporaryFile`, this gives the zip file the usual permissions
+        tmp = zip_path.with_name(f".{zip_path.name}.{os.getpid()}.tmp")
+        try:
+            with tempfile.TemporaryDirectory() as staging, ZipFile(tmp, "w", ZIP_DEFLATED) as archive:
+                self.archive = archive
+                self.build(Path(staging))
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        finally:
+            self.archive = None
+        os.replace(tmp, zip_path)
+
+    def build(self, dir_path: Path) -> None:
+        """
+        Builds the profile crate in `dir_path`
+        """
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+        # Load the schema and its derived queries once, up front, for all of the stages to share
+        with timed("load_schema"):
+            self.context.warm()
+
+        # Build up a crate as we create files
+        crate = self.make_crate(dir_path)
+        manifest_path = self.manifest_path(dir_path)
+        manifest = BuildManifest() if manifest_path is None else BuildManifest.read(manifest_path)
+
+        self.run_stages(dir_path, crate, manifest)
 
         # Document ro-crate-metadata.json
         crate.graph.add((crate.metadata_entity, uris.name, Literal("RO-Crate Metadata File")))
         crate.graph.add((crate.metadata_entity, uris.description, Literal("Describes the profile crate as an RO-Crate itself in JSON-LD format.")))
 
-        self.make_docs(dir_path, crate)
+        # The profile page describes the other artifacts using the crate graph, so this always runs last
+        if self.is_current("make_docs", dir_path, manifest):
+            logger.info("Skipping make_docs, whose inputs are unchanged")
+            for triple in manifest.stages["make_docs"].triples:
+                crate.graph.add(triple)
+        else:
+            manifest.record("make_docs", self.stage_inputs("make_docs", manifest), self.record_stage("make_docs", dir_path, crate))
 
         # RO-Crate Profile
         logger.info(f"Writing ro-crate-metadata.json")
-        crate.write()
+        with timed("write_metadata", output=dir_path / "ro-crate-metadata.json"):
+            self.write_metadata(crate)
+        if manifest_path is not None:
+            manifest.write(manifest_path)
         logger.info(f"Finished writing ro-crate-metadata.json")
 
-@shared_arguments(ProfileCrateGenerator)
-@click.command(name="rocrate-profile")
-@click.version_option(__version__, "-V", "--version")
-@click.option(
-    "--output-dir",
-    help=f"Directory into which the RO-Crate Profile will be written",
-)
-def cli(yamlfile: str, output_dir: Path, **kwargs: Any):
-    # getLogger("linkml.utils.generator").setLevel("ERROR")
-    ProfileCrateGenerator(yamlfile, base_dir=str(Path(yamlfile).parent)).serialize(str(output_dir), **kwargs)
+def run_stage(generator_args: dict[str, Any], stage: str, directory: Path, measure: bool = False) -> tuple[list[Triple], list[Step]]:
+    """
+    Runs a single stage of `ProfileCrateGenerator` in a worker process.
+
+    Params:
+        measure: If true, the recorded steps include the size of their output
+
+    Returns:
+        The triples that the stage added to the crate, in sorted order, and the steps recorded while running it
+    """
+    with measuring_outputs(measure), timed("worker") as worker:
+        generator = ProfileCrateGenerator(**generator_args)
+        with timed("load_schema"):
+            generator.context.warm()
+        triples = generator.record_stage(stage, directory, generator.make_crate(directory))
+    return triples, worker.steps
 
 if __name__ == "__main__":
     cli()
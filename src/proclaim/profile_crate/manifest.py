@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+from hashlib import sha256
+from importlib.metadata import PackageNotFoundError, version
+from importlib.abc import Traversable
+from pathlib import Path
+import json
+
+from rdflib.term import Node
+from rdflib.util import from_n3
+
+#: A single RDF statement that a stage added to the crate
+Triple = tuple[Node, Node, Node]
+
+#: Bump this if the manifest format changes, to invalidate old manifests
+MANIFEST_VERSION = 1
+#: Version recorded when proclaim is run from a source tree that isn't installed
+DEFAULT_VERSION = "0+unknown"
+
+def hash_bytes(content: bytes) -> str:
+    return sha256(content).hexdigest()
+
+def hash_file(path: Path | Traversable) -> str:
+    return hash_bytes(path.read_bytes())
+
+def proclaim_version() -> str:
+    try:
+        return version("proclaim")
+    except PackageNotFoundError:
+        return DEFAULT_VERSION
+
+@dataclass
+class StageRecord:
+    """
+    What a stage consumed and produced the last time it was run
+    """
+    #: Maps the name of each input to a hash of its contents
+    inputs: dict[str, str]
+    #: Triples that the stage added to the crate, in sorted order
+    triples: list[Triple]
+
+    def to_json(self) -> dict:
+        return {
+            "inputs": self.inputs,
+            "triples": [[term.n3() for term in triple] for triple in self.triples],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "StageRecord":
+        return cls(
+            inputs=data["inputs"],
+            triples=[tuple(from_n3(term) for term in triple) for triple in data["triples"]],
+        )
+
+@dataclass
+class BuildManifest:
+    """
+    Records the inputs of each stage of a profile crate build, so that unchanged stages can be skipped by the next build
+    """
+    stages: dict[str, StageRecord] = field(default_factory=dict)
+
+    def is_current(self, stage: str, inputs: dict[str, str]) -> bool:
+        """
+        Returns true if `stage` was last run with exactly the same inputs
+        """
+        record = self.stages.get(stage)
+        return record is not None and record.inputs == inputs
+
+    def record(self, stage: str, inputs: dict[str, str], triples: list[Triple]) -> None:
+        self.stages[stage] = StageRecord(inputs=inputs, triples=triples)
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "version": MANIFEST_VERSION,
+            "stages": {stage: record.to_json() for stage, record in self.stages.items()},
+        }, indent=2))
+
+    @classmethod
+    def read(cls, path: Path) -> "BuildManifest":
+        """
+        Reads the manifest from a previous build, or returns an empty manifest if there isn't a usable one
+        """
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return cls()
+        if data.get("version") != MANIFEST_VERSION:
+            return cls()
+        return cls(stages={stage: StageRecord.from_json(record) for stage, record in data["stages"].items()})
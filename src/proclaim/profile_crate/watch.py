@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+from logging import getLogger
+from pathlib import Path
+from queue import Empty, Queue
+from typing import Any
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from proclaim.profile_crate.generator import ProfileCrateGenerator
+from proclaim.schema_cache import SchemaCache
+from proclaim.vocabulary import VocabularyHtmlGenerator, affected_pages
+
+logger = getLogger(__name__)
+
+#: Templates that determine the content of every vocabulary page
+VOCABULARY_TEMPLATES = ProfileCrateGenerator.stage_templates["make_vocab"]
+
+class ChangeHandler(FileSystemEventHandler):
+    """
+    Queues the paths of watched files that have been modified
+    """
+    def __init__(self, watched: set[Path], changes: Queue[Path]):
+        self.watched = watched
+        self.changes = changes
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        # Editors often save by writing a temporary file and renaming it over the original
+        for path in [event.src_path, getattr(event, "dest_path", "")]:
+            if path and Path(str(path)).resolve() in self.watched:
+                self.changes.put(Path(str(path)).resolve())
+
+@dataclass
+class ProfileWatcher:
+    """
+    Keeps the vocabulary of a profile crate up to date as its schema and templates are edited.
+    The schema's imports stay loaded between rebuilds, and only the vocabulary pages affected by a change are re-rendered.
+    """
+    generator_args: dict[str, Any]
+    "Keyword arguments used to create a `ProfileCrateGenerator` for each version of the schema"
+    directory: Path
+    "Output directory of the profile crate"
+    debounce: float = 0.2
+    "Seconds to wait for further changes before rebuilding, since saving a file often produces several events"
+    generator: ProfileCrateGenerator = field(init=False)
+
+    def __post_init__(self):
+        if self.generator_args.get("schema_cache") is None:
+            # Imports are loaded once and reused, even if there's no on-disk cache
+            cache_dir = self.generator_args.get("cache_dir")
+            self.generator_args["schema_cache"] = SchemaCache(None if cache_dir is None else Path(cache_dir))
+        self.generator = ProfileCrateGenerator(**self.generator_args)
+
+    @property
+    def vocabulary_dir(self) -> Path:
+        return self.directory / "vocabulary"
+
+    def watched_paths(self) -> set[Path]:
+        """
+        Returns all local schema files in the import closure, and the vocabulary templates
+        """
+        paths = {Path(str(template)).resolve() for template in VOCABULARY_TEMPLATES}
+        for schema_name in self.generator.context.imports_closure:
+            source_file = self.generator.sv.schema_map[schema_name].source_file
+            if source_file is not None and Path(source_file).is_file():
+                paths.add(Path(source_file).resolve())
+        return paths
+
+    def update(self, changed: set[Path]) -> None:
+        """
+        Reloads the schema and re-renders the vocabulary pages affected by changes to the `changed` files
+        """
+        previous = self.generator
+        try:
+            self.generator = ProfileCrateGenerator(**self.generator_args)
+            self.generator.context.warm()
+        except Exception:
+            logger.exception("Failed to load the modified schema")
+            self.generator = previous
+            return
+
+        if changed & {Path(str(template)).resolve() for template in VOCABULARY_TEMPLATES}:
+            properties, classes = set(self.generator.context.slots), set(self.generator.context.classes)
+        else:
+            properties, classes = affected_pages(previous.context, self.generator.context)
+        logger.info(f"Updating {len(properties)} property pages and {len(classes)} class pages")
+        if properties or classes:
+            VocabularyHtmlGenerator(
+                schema=self.generator.schema,
+                context=self.generator.context,
+                bytecode_cache_dir=self.generator.bytecode_cache_dir,
+                renderer=self.generator.renderer,
+                site_name=f"{self.generator.schema.name} Vocabulary"
+            ).update(str(self.vocabulary_dir), properties, classes)
+
+    def watch(self) -> None:
+        """
+        Watches for changes until interrupted
+        """
+        changes: Queue[Path] = Queue()
+        watched = self.watched_paths()
+        handler = ChangeHandler(watched, changes)
+        observer = Observer()
+        directories: set[Path] = set()
+        def schedule(paths: set[Path]) -> None:
+            for directory in {path.parent for path in paths} - directories:
+                observer.schedule(handler, str(directory))
+                directories.add(directory)
+        schedule(watched)
+        observer.start()
+        logger.info(f"Watching {len(watched)} files for changes")
+        try:
+            while True:
+                changed = {changes.get()}
+                # Wait until the changes have settled down
+                try:
+                    while True:
+                        changed.add(changes.get(timeout=self.debounce))
+                except Empty:
+                    pass
+                self.update(changed)
+                # Imports may have been added
+                new_watched = self.watched_paths()
+                schedule(new_watched)
+                watched.clear()
+                watched.update(new_watched)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            observer.stop()
+            observer.join()
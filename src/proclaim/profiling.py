@@ -0,0 +1,103 @@
+"""
+Profiles part of a build with cProfile, and summarises where the time went.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, TextIO, TypeVar
+import cProfile
+import pstats
+import sys
+
+import click
+
+#: Value of `--profile-stage` that profiles the whole run, rather than a single stage
+WHOLE_RUN = "all"
+
+F = TypeVar("F", bound=Callable)
+
+def package_of(filename: str) -> str:
+    """
+    Returns the name of the package that a profiled function belongs to, such as `rdflib`, or `builtins` for functions written in C
+    """
+    if filename == "~" or filename.startswith("<"):
+        return "builtins"
+    parts = Path(filename).parts
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            index = parts.index(marker)
+            if index + 1 < len(parts):
+                return parts[index + 1].removesuffix(".py")
+    if "proclaim" in parts:
+        return "proclaim"
+    return "stdlib"
+
+def package_times(stats: pstats.Stats) -> dict[str, float]:
+    """
+    Returns the time spent inside the functions of each package, excluding the functions they call, slowest first
+    """
+    times: dict[str, float] = defaultdict(float)
+    # Each entry is (primitive calls, total calls, own time, cumulative time, callers)
+    for (filename, _, _), (_, _, own_time, _, _) in stats.stats.items():  # type: ignore[attr-defined]
+        times[package_of(filename)] += own_time
+    return dict(sorted(times.items(), key=lambda item: item[1], reverse=True))
+
+def print_summary(stats: pstats.Stats, top: int, stream: TextIO) -> None:
+    """
+    Prints the time spent in each package, followed by the `top` functions with the most cumulative time
+    """
+    print(f"{'package':<24} {'seconds':>10}", file=stream)
+    for package, seconds in package_times(stats).items():
+        print(f"{package:<24} {seconds:>10.3f}", file=stream)
+    stats.stream = stream  # type: ignore[attr-defined]
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+
+@contextmanager
+def profiled(output: Path, top: int = 20, stream: TextIO | None = None) -> Iterator[cProfile.Profile]:
+    """
+    Profiles the enclosed code, writes the profile to `output` for use with `pstats` or `snakeviz`, and prints a summary of it
+
+    Params:
+        top: Number of functions in the summary
+        stream: Where the summary is printed. If `None`, this is stderr, so that it doesn't mix with output written to stdout.
+    """
+    if stream is None:
+        stream = sys.stderr
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        output.parent.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(output)
+        print(f"Wrote profile to {output}", file=stream)
+        print_summary(pstats.Stats(profile), top, stream)
+
+def profile_options(stages: list[str]) -> Callable[[F], F]:
+    """
+    Adds the `--profile-stage`, `--profile-output` and `--profile-top` options to a command
+
+    Params:
+        stages: Stages that can be profiled on their own
+    """
+    def decorator(func: F) -> F:
+        func = click.option(
+            "--profile-top",
+            type=int,
+            default=20,
+            show_default=True,
+            help="Number of functions in the profile summary",
+        )(func)
+        func = click.option(
+            "--profile-output",
+            type=click.Path(dir_okay=False, path_type=Path),
+            help="File to which the profile is written. Defaults to <stage>.prof in the working directory.",
+        )(func)
+        func = click.option(
+            "--profile-stage",
+            type=click.Choice([*stages, WHOLE_RUN]),
+            help=f"Profile one stage, or '{WHOLE_RUN}' for the whole run, with cProfile. The time spent in each package, and the slowest functions, are printed to stderr.",
+        )(func)
+        return func
+    return decorator
@@ -0,0 +1,142 @@
+from dataclasses import dataclass, field
+from hashlib import sha256
+from logging import getLogger
+from pathlib import Path
+import os
+import pickle
+import tempfile
+
+from linkml_runtime import SCHEMA_DIRECTORY, SchemaView, __version__ as linkml_runtime_version
+from linkml_runtime.linkml_model import SchemaDefinition
+from linkml_runtime.utils.context_utils import map_import
+from linkml_runtime.utils.schemaview import is_absolute_path, load_schema_wrap
+
+from proclaim.paths import DEFAULT_CACHE_DIR
+
+logger = getLogger(__name__)
+
+#: Total size of the cache in bytes, above which the least recently used entries are deleted
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+@dataclass
+class SchemaCache:
+    """
+    Content-addressed, size-bounded cache of parsed schemas.
+    Each entry is keyed by a hash of the schema file's contents, so edited schemas are never served stale.
+    Schemas are also kept in memory, so that long-running processes only load each one once.
+    They are kept pickled, so that every load gets its own copy.
+    """
+    directory: Path | None = DEFAULT_CACHE_DIR
+    "Directory for the on-disk cache. If `None`, schemas are only cached in memory."
+    max_size: int = DEFAULT_MAX_SIZE
+    loaded: dict[tuple[str, str], bytes] = field(default_factory=dict, repr=False)
+    "Pickled schemas loaded by this process, keyed by cache key and path"
+
+    def key(self, content: bytes) -> str:
+        """
+        Returns the cache key for a schema file with the given contents.
+        The linkml_runtime version is included because the pickled objects depend on it.
+        """
+        return sha256(linkml_runtime_version.encode() + b"\0" + content).hexdigest()
+
+    def load(self, path: str) -> SchemaDefinition:
+        """
+        Loads a schema file, using the cached copy if one exists for the file's current contents.
+        Each call returns a new copy of the schema, because `SchemaView` queries modify the schemas they are given.
+        """
+        key = self.key(Path(path).read_bytes())
+        path = os.path.abspath(path)
+        if (key, path) not in self.loaded:
+            self.loaded[key, path] = self.load_pickle(key, path)
+        return pickle.loads(self.loaded[key, path])
+
+    def load_pickle(self, key: str, path: str) -> bytes:
+        """
+        Returns the pickled schema for a cache key, reading it from the on-disk cache or parsing the schema file
+        """
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entry = self.directory / f"{key}.pickle"
+            try:
+                schema = pickle.loads(entry.read_bytes())
+                # Mark the entry as recently used
+                entry.touch()
+                logger.info(f"Loaded {path} from the schema cache")
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                data = self.dumps(load_schema_wrap(path), path)
+                self.store(entry, data)
+                return data
+        else:
+            schema = load_schema_wrap(path)
+        return self.dumps(schema, path)
+
+    def dumps(self, schema: SchemaDefinition, path: str) -> bytes:
+        """
+        Pickles a schema that was loaded from `path`
+        """
+        # The same content may have been cached from a different location.
+        # The loader also records the source file using a type that can't be pickled.
+        schema.source_file = path
+        return pickle.dumps(schema, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def store(self, entry: Path, data: bytes) -> None:
+        """
+        Atomically writes an entry to the cache, then evicts old entries if the cache is too large
+        """
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as tmp:
+            tmp.write(data)
+        os.replace(tmp.name, entry)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Deletes the least recently used entries until the cache fits within `max_size`.
+        This covers every file under `directory`, including those that other parts of proclaim cache there: merged schemas, compiled templates and the manifests of incremental builds.
+        Evicting a manifest is safe, but means that the next incremental build into its output directory rebuilds every stage.
+        """
+        if self.directory is None:
+            return
+        # Temporary files are still being written by another process
+        files = [path for path in self.directory.rglob("*") if path.is_file() and path.suffix != ".tmp"]
+        entries = sorted(files, key=lambda entry: entry.stat().st_mtime, reverse=True)
+        total = 0
+        for entry in entries:
+            total += entry.stat().st_size
+            if total > self.max_size:
+                entry.unlink(missing_ok=True)
+
+class CachedSchemaView(SchemaView):
+    """
+    A `SchemaView` that loads local imports through a `SchemaCache`.
+    Imports that aren't local files, such as URLs, are loaded as normal.
+    """
+    cache: SchemaCache
+
+    def __init__(self, schema: str | Path | SchemaDefinition, cache: SchemaCache, **kwargs) -> None:
+        super().__init__(schema, **kwargs)
+        self.cache = cache
+
+    def import_path(self, imp: str, from_schema: SchemaDefinition) -> str | None:
+        """
+        Resolves an import to a local file path in the same way as `SchemaView.load_import`.
+        Returns `None` if the import doesn't refer to a local file.
+        """
+        # The same import map as `SchemaView.load_import`, whose user entries can override the built-in `linkml:` entry
+        importmap = {"linkml:": str(SCHEMA_DIRECTORY), **(self.importmap or {})}
+        if isinstance(importmap.get(str(imp)), dict):
+            return None
+        sname = map_import(importmap, self.namespaces, imp)
+        if from_schema.source_file and not is_absolute_path(sname):
+            path = os.path.join(os.path.dirname(from_schema.source_file), sname + ".yaml")
+        else:
+            path = sname + ".yaml"
+        if "://" in path or not os.path.isfile(path):
+            return None
+        return path
+
+    def load_import(self, imp: str, from_schema: SchemaDefinition | None = None) -> SchemaDefinition:
+        path = self.import_path(imp, from_schema or self.schema)
+        if path is None:
+            return super().load_import(imp, from_schema)
+        return self.cache.load(path)
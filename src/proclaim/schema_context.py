@@ -0,0 +1,161 @@
+from copy import deepcopy
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any, NamedTuple, cast
+
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import (
+    ClassDefinition,
+    ClassDefinitionName,
+    ElementName,
+    SchemaDefinition,
+    SchemaDefinitionName,
+    SlotDefinition,
+    SlotDefinitionName,
+)
+from typing_extensions import Self
+
+from proclaim.jsonld_context import make_jsonld_context
+from proclaim.schema_cache import CachedSchemaView
+from proclaim.util import description
+
+
+class SlotRow(NamedTuple):
+    """
+    The parts of an induced slot that are shown in the slot table of a class
+    """
+    name: SlotDefinitionName
+    description: str
+    range: str | None
+
+@dataclass(frozen=True)
+class SchemaContext:
+    """
+    Read-only view of a schema that is shared by every generator involved in a single build.
+    Each derived query is computed once, on first use, and then reused by all of the generators.
+    """
+    sv: SchemaView
+
+    @cached_property
+    def imports_closure(self) -> list[SchemaDefinitionName]:
+        """
+        Names of the schema and all the schemas that it imports, directly or indirectly
+        """
+        return self.sv.imports_closure()
+
+    @cached_property
+    def classes(self) -> dict[ClassDefinitionName, ClassDefinition]:
+        """
+        Classes defined in the schema itself, excluding imports
+        """
+        return self.sv.all_classes(imports=False)
+
+    @cached_property
+    def slots(self) -> dict[SlotDefinitionName, SlotDefinition]:
+        """
+        Slots defined in the schema itself, excluding imports
+        """
+        return self.sv.all_slots(imports=False)
+
+    @cached_property
+    def class_slots(self) -> dict[ClassDefinitionName, list[SlotDefinitionName]]:
+        """
+        Maps each local class to the names of all its slots, including inherited ones
+        """
+        return {cname: self.sv.class_slots(cname, imports=True) for cname in self.classes}
+
+    @cached_property
+    def induced_slots(self) -> dict[ClassDefinitionName, dict[SlotDefinitionName, SlotDefinition]]:
+        """
+        Maps each local class to its slots, as modified by the class's `slot_usage` and that of its ancestors
+        """
+        return {
+            cname: {sname: self.sv.induced_slot(slot_name=sname, class_name=cname) for sname in snames}
+            for cname, snames in self.class_slots.items()
+        }
+
+    @cached_property
+    def slot_table(self) -> dict[ClassDefinitionName, tuple[SlotRow, ...]]:
+        """
+        Maps each local class to one row per induced slot, in the same order as `class_slots`
+        """
+        return {
+            cname: tuple(SlotRow(sname, description(slot), slot.range) for sname, slot in slots.items())
+            for cname, slots in self.induced_slots.items()
+        }
+
+    @cached_property
+    def class_parents(self) -> dict[ClassDefinitionName, list[ClassDefinitionName]]:
+        return {cname: self.sv.class_parents(cname) for cname in self.classes}
+
+    @cached_property
+    def class_children(self) -> dict[ClassDefinitionName, list[ClassDefinitionName]]:
+        return {cname: self.sv.class_children(cname) for cname in self.classes}
+
+    @cached_property
+    def class_ancestors(self) -> dict[ClassDefinitionName, list[ClassDefinitionName]]:
+        return {cname: self.sv.class_ancestors(cname) for cname in self.classes}
+
+    @cached_property
+    def reachable_classes(self) -> set[ClassDefinitionName]:
+        """
+        Local classes, plus every imported class that they refer to, directly or indirectly, through `is_a`, mixins or slot ranges
+        """
+        all_classes = self.sv.all_classes()
+        reached = set(self.classes)
+        pending = list(self.classes)
+        while pending:
+            cname = pending.pop()
+            slots = self.induced_slots.get(cname) or {sname: self.sv.induced_slot(sname, cname) for sname in self.sv.class_slots(cname)}
+            ranges = [slot.range for slot in slots.values()] + [alternative.range for slot in slots.values() for alternative in slot.any_of]
+            for neighbour in [*self.sv.class_parents(cname), *ranges]:
+                if neighbour in all_classes and neighbour not in reached:
+                    reached.add(neighbour)
+                    pending.append(neighbour)
+        return reached
+
+    @cached_property
+    def uris(self) -> dict[ElementName, str]:
+        """
+        Maps each local class, and each slot used by a local class, to its expanded URI
+        """
+        names = {*self.classes, *(sname for snames in self.class_slots.values() for sname in snames)}
+        return {name: self.sv.get_uri(cast(ElementName, name), expand=True) for name in names}
+
+    @cached_property
+    def jsonld_context(self) -> dict[str, Any]:
+        """
+        JSON-LD context that maps the terms of the schema and its imports to their URIs
+        """
+        return make_jsonld_context(self.sv)
+
+    @cached_property
+    def merged_schema(self) -> SchemaDefinition:
+        """
+        A copy of the schema with its entire import closure merged into it, as made by `SchemaView.merge_imports()`.
+        This starts from freshly loaded schemas, because queries on `sv` fill in derived fields such as `domain_of`,
+        which would make the result depend on what had been computed beforehand.
+        If `sv` loads its imports through a schema cache, they are loaded from there rather than parsed again.
+        """
+        source = self.sv.schema.source_file
+        schema = source if source is not None and Path(source).is_file() else deepcopy(self.sv.schema)
+        if isinstance(self.sv, CachedSchemaView):
+            merged: SchemaView = CachedSchemaView(schema, cache=self.sv.cache, importmap=self.sv.importmap)
+        else:
+            merged = SchemaView(schema, importmap=self.sv.importmap)
+        merged.merge_imports()
+        return merged.schema
+
+    def warm(self) -> Self:
+        """
+        Computes all of the derived queries up front, and returns this context
+        """
+        self.imports_closure
+        self.induced_slots
+        self.slot_table
+        self.class_parents
+        self.class_children
+        self.class_ancestors
+        self.uris
+        return self
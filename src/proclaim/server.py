@@ -0,0 +1,249 @@
+"""
+A daemon that keeps generators loaded between builds, along with their parsed schemas and compiled templates,
+and the client that the commands use to send it work.
+
+Each request is a single line of JSON sent over a Unix socket, and is answered by a single line of JSON.
+This module only imports the generators once the server starts, so that the client stays fast to start.
+"""
+from dataclasses import dataclass, field
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+import json
+import os
+import socket
+import socketserver
+
+import click
+
+from proclaim.paths import DEFAULT_CACHE_DIR, DEFAULT_SOCKET
+
+if TYPE_CHECKING:
+    from proclaim.schema_cache import SchemaCache
+
+logger = getLogger(__name__)
+
+#: Requests that the server accepts
+COMMANDS = ["ping", "profile", "mode"]
+
+#: Generator options that are paths, which the client makes absolute, since the server has its own working directory
+PATH_OPTIONS = ["schema", "base_dir", "cache_dir", "timings", "profile_output", "mode_file_template", "output_zip"]
+
+def send_request(socket_path: Path, request: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Sends a request to the server and waits for its response
+
+    Returns:
+        The response, or `None` if no server is listening on `socket_path`
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        with client.makefile("rw") as stream:
+            stream.write(json.dumps(request, default=str) + "\n")
+            stream.flush()
+            return json.loads(stream.readline())
+
+def run_on_server(socket_path: Path, command: str, options: dict[str, Any], **request: Any) -> dict[str, Any] | None:
+    """
+    Asks the server to run a command, for clients that can fall back to running it themselves
+
+    Params:
+        options: Keyword arguments of the generator
+        **request: Other fields of the request, such as `output_dir`
+
+    Returns:
+        The response, or `None` if no server is running
+    """
+    response = send_request(socket_path, {"command": command, "options": absolute_options(options), **request})
+    if response is None:
+        logger.info(f"No server is listening on {socket_path}, so running in this process")
+        return None
+    if not response["ok"]:
+        raise click.ClickException(response["error"])
+    return response
+
+def absolute_options(options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Returns generator options whose paths are absolute, and whose values can be sent as JSON
+    """
+    return {
+        key: str(Path(value).resolve()) if key in PATH_OPTIONS and value is not None else value
+        for key, value in options.items()
+    }
+
+@dataclass
+class LoadedGenerator:
+    """
+    A generator kept by the server, along with the modification times of its local schema files
+    """
+    generator: Any
+    sources: dict[str, int]
+    "Modification time in nanoseconds of each local file in the schema's import closure"
+
+    @classmethod
+    def create(cls, generator: Any) -> "LoadedGenerator":
+        context = generator.context
+        sources = {}
+        for schema_name in context.imports_closure:
+            source_file = context.sv.schema_map[schema_name].source_file
+            if source_file is not None and Path(source_file).is_file():
+                sources[str(source_file)] = Path(source_file).stat().st_mtime_ns
+        return cls(generator, sources)
+
+    def is_current(self) -> bool:
+        """
+        Returns true if none of the schema files have changed since the generator loaded them
+        """
+        try:
+            return all(Path(path).stat().st_mtime_ns == mtime for path, mtime in self.sources.items())
+        except OSError:
+            return False
+
+@dataclass
+class ProclaimServer:
+    """
+    Handles build requests, reusing generators until their schemas change.
+    All generators share one schema cache, so imports like `schemaorg_current` are parsed once, however many schemas use them.
+    Requests are handled one at a time, since the generators and schema views aren't thread safe.
+    """
+    socket_path: Path = DEFAULT_SOCKET
+    cache_dir: Path | None = DEFAULT_CACHE_DIR
+    "Directory in which parsed imports and compiled templates are cached. If `None`, they are only kept in memory."
+    generators: dict[tuple[str, str], LoadedGenerator] = field(default_factory=dict, repr=False)
+    "Generators that have been loaded, keyed by the command and its options"
+    lock: Lock = field(default_factory=Lock, repr=False)
+    schema_cache: "SchemaCache" = field(init=False, repr=False)
+    "The `SchemaCache` shared by every generator"
+
+    def __post_init__(self):
+        from proclaim.schema_cache import SchemaCache
+        self.schema_cache = SchemaCache(self.cache_dir)
+
+    def load_generator(self, command: str, options: dict[str, Any]) -> Any:
+        """
+        Creates the generator for a request
+        """
+        if command == "profile":
+            from proclaim.profile_crate.generator import ProfileCrateGenerator
+            return ProfileCrateGenerator(**options, schema_cache=self.schema_cache)
+        from proclaim.mode.generator import RoCrateModeGenerator
+        from proclaim.schema_cache import CachedSchemaView
+        from proclaim.schema_context import SchemaContext
+        view = CachedSchemaView(options["schema"], cache=self.schema_cache, base_dir=options.get("base_dir"))
+        return RoCrateModeGenerator(**options, context=SchemaContext(view))
+
+    def generator(self, command: str, options: dict[str, Any]) -> Any:
+        """
+        Returns the generator for a request, reusing the one from an earlier request if its schema hasn't changed
+        """
+        key = (command, json.dumps(options, sort_keys=True))
+        loaded = self.generators.get(key)
+        if loaded is None or not loaded.is_current():
+            logger.info(f"Loading {options['schema']}")
+            loaded = LoadedGenerator.create(self.load_generator(command, options))
+            self.generators[key] = loaded
+        return loaded.generator
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Runs a request, and returns the response.
+        Errors are returned to the client rather than raised, so that the server keeps running.
+        """
+        start = perf_counter()
+        output = None
+        try:
+            command = request["command"]
+            if command not in COMMANDS:
+                raise ValueError(f"Unknown command {command}")
+            if command != "ping":
+                with self.lock:
+                    generator = self.generator(command, request["options"])
+                    if command == "profile":
+                        generator.serialize(request.get("output_dir"))
+                    else:
+                        output = generator.serialize()
+        except Exception as e:
+            logger.exception("Failed to handle a request")
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"ok": True, "output": output, "seconds": perf_counter() - start}
+
+    def serve(self) -> socketserver.BaseServer:
+        """
+        Returns a socket server that passes requests to `handle`. Call `serve_forever()` on it to start handling them.
+        """
+        proclaim = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                request = json.loads(self.rfile.readline())
+                self.wfile.write((json.dumps(proclaim.handle(request)) + "\n").encode())
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            if send_request(self.socket_path, {"command": "ping"}) is not None:
+                raise RuntimeError(f"A server is already listening on {self.socket_path}")
+            # Left behind by a server that didn't shut down cleanly
+            self.socket_path.unlink()
+        return socketserver.ThreadingUnixStreamServer(str(self.socket_path), RequestHandler)
+
+    def warm(self) -> None:
+        """
+        Imports the generators, and the libraries that they use, before the first request arrives
+        """
+        import proclaim.profile_crate.generator
+        import proclaim.mode.generator
+        import proclaim.shacl.generator
+        import proclaim.vocabulary
+        import proclaim.html.generator
+
+@click.command(name="serve")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=DEFAULT_SOCKET,
+    show_default=True,
+    help="Unix socket on which to listen for requests",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=DEFAULT_CACHE_DIR,
+    show_default=True,
+    help="Directory in which parsed imports and compiled templates are cached",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Only keep parsed imports in memory, without reading or writing the cache",
+)
+def cli(socket_path: Path, cache_dir: Path, no_cache: bool):
+    """
+    Keeps the generators loaded, and builds profiles and mode files for `proclaim-profile --server` and `proclaim-mode --server`
+    """
+    import logging
+    import signal
+    logging.basicConfig(level=logging.INFO)
+
+    def stop(signum: int, frame: Any) -> None:
+        raise KeyboardInterrupt
+    # Stop cleanly when run by a service manager, which sends SIGTERM
+    signal.signal(signal.SIGTERM, stop)
+    server = ProclaimServer(socket_path, None if no_cache else cache_dir)
+    server.warm()
+    with server.serve() as socket_server:
+        logger.info(f"Listening on {socket_path}")
+        try:
+            socket_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+if __name__ == "__main__":
+    cli()
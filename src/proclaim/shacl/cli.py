@@ -0,0 +1,24 @@
+"""
+Entry point of `proclaim-shacl`, which loads the generator only once the command runs
+"""
+from typing import Any
+
+import click
+
+from proclaim.cli import shared_arguments, version_option
+
+@shared_arguments(["ttl"])
+@click.command(name="shacl")
+@click.option(
+    "--pruned/--all-classes",
+    default=False,
+    show_default=True,
+    help="Only generate shapes for the schema's own classes and the imported classes that they refer to",
+)
+@version_option
+def cli(yamlfile: str, pruned: bool, **kwargs: Any):
+    from proclaim.shacl.generator import ProfileShaclGenerator
+    print(ProfileShaclGenerator(yamlfile, pruned=pruned, **kwargs).serialize(**kwargs))
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,473 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import cached_property
+from logging import getLogger
+from typing import Any, ClassVar, Iterable
+
+from linkml_runtime.linkml_model.meta import ClassDefinition, ClassDefinitionName, ClassRule, PresenceEnum, SlotDefinition, SlotDefinitionName
+from linkml_runtime import SchemaView
+from linkml_runtime.utils.formatutils import underscore
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDF, RDFS, SH, XSD, NamespaceManager
+from rdflib.term import Node
+
+from linkml.utils.generator import Generator
+
+from proclaim.schema_context import SchemaContext
+from proclaim.shacl.cli import cli
+from proclaim.shacl.ifabsent import default_value
+from proclaim.util import mandatory
+
+logger = getLogger(__name__)
+
+#: Range that accepts any value, so it isn't constrained by `sh:class`
+LINKML_ANY_URI = "https://w3id.org/linkml/Any"
+#: Type URIs whose values are IRIs or blank nodes rather than literals, as in `ShaclGenerator`
+NON_LITERAL_TYPE_URIS = frozenset({"xsd:anyURI", "http://www.w3.org/ns/shex#nonLiteral", "http://www.w3.org/ns/shex#iri"})
+#: The subset of `NON_LITERAL_TYPE_URIS` whose values must be IRIs
+IRI_ONLY_TYPE_URIS = frozenset({"xsd:anyURI"})
+#: Types whose values are URIs or CURIEs, so that the values allowed by `subproperty_of` are slot URIs rather than names
+URI_TYPES = frozenset({"uri", "uriorcurie", "curie"})
+#: Datatypes of the built-in types, for schemas that use them as ranges without importing `linkml:types`.
+#: As in `ShaclGenerator`, `curie` has no entry.
+BUILTIN_DATATYPES = {
+    "string": XSD.string,
+    "boolean": XSD.boolean,
+    "duration": XSD.duration,
+    "datetime": XSD.dateTime,
+    "date": XSD.date,
+    "time": XSD.time,
+    "decimal": XSD.decimal,
+    "integer": XSD.integer,
+    "float": XSD.float,
+    "double": XSD.double,
+    "uri": XSD.anyURI,
+    "ncname": XSD.string,
+    "objectidentifier": URIRef("http://www.w3.org/ns/shex#iri"),
+    "nodeidentifier": URIRef("http://www.w3.org/ns/shex#nonLiteral"),
+    "jsonpointer": XSD.string,
+    "jsonpath": XSD.string,
+    "sparqlpath": XSD.string,
+}
+
+#: The shape of an induced slot is determined by the slot's name, the ancestor it was declared on as an attribute (if any),
+#: and the ancestors whose `slot_usage` refines it, in order of precedence
+InductionKey = tuple[SlotDefinitionName, ClassDefinitionName | None, tuple[ClassDefinitionName, ...]]
+
+@dataclass
+class PropertyShape:
+    """
+    A property shape, as Turtle, minus the parts that depend on the class that uses it
+    """
+    slot: SlotDefinition
+    "The induced slot"
+    path: URIRef
+    body: list[str]
+    "Predicate-object pairs of the shape, as Turtle"
+
+@dataclass
+class ProfileShaclGenerator(Generator):
+    """
+    Converts a LinkML schema into SHACL shapes.
+    The shapes are equivalent to those of linkml's `ShaclGenerator` with its default options, but are generated much faster:
+    the already-loaded schema is reused, slots are only induced once for all the classes that use them without changes,
+    and the Turtle is written directly rather than building and canonicalizing an RDF graph.
+    """
+    valid_formats: ClassVar[list[str]] = ["ttl"]
+    uses_schemaloader: ClassVar[bool] = False
+    requires_metamodel: ClassVar[bool] = False
+
+    context: SchemaContext | None = None
+    "Schema context shared with other generators. If not provided, one is created for this generator."
+
+    pruned: bool = False
+    """
+    If true, only emit shapes for the schema's own classes and the imported classes that they can reach.
+    Otherwise, emit shapes for every class in the import closure, as `ShaclGenerator` does.
+    """
+
+    # Memoized results, which are shared between all the classes
+    induced: dict[InductionKey, SlotDefinition] = field(default_factory=dict, init=False, repr=False)
+    properties: dict[InductionKey, PropertyShape] = field(default_factory=dict, init=False, repr=False)
+    identifiers: dict[ClassDefinitionName, SlotDefinition | None] = field(default_factory=dict, init=False, repr=False)
+    ranges: dict[str, list[str]] = field(default_factory=dict, init=False, repr=False)
+    slot_uris: dict[str, URIRef] = field(default_factory=dict, init=False, repr=False)
+    descendant_slot_uris: dict[ClassDefinitionName, set[URIRef]] = field(default_factory=dict, init=False, repr=False)
+    terms: dict[Node, str] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.context is None:
+            self.context = SchemaContext(mandatory(self.schemaview, "Missing schema"))
+        else:
+            # Use the shared schema view, whose imports and derived queries may already be loaded
+            self.schemaview = self.context.sv
+
+    @property
+    def sv(self) -> SchemaView:
+        return mandatory(self.context, "Missing schema").sv
+
+    @cached_property
+    def namespace_manager(self) -> NamespaceManager:
+        """
+        Prefixes used to abbreviate IRIs, which are the same as those bound by `ShaclGenerator`
+        """
+        namespaces = Graph().namespace_manager
+        namespaces.bind("sh", SH)
+        for prefix in self.sv.schema.prefixes.values():
+            namespaces.bind(str(prefix.prefix_prefix), prefix.prefix_reference)
+        return namespaces
+
+    @cached_property
+    def all_classes(self) -> dict[ClassDefinitionName, ClassDefinition]:
+        return self.sv.all_classes()
+
+    def slot_uri(self, sname: str) -> URIRef:
+        """
+        Returns the URI of a slot, as used for `sh:ignoredProperties`
+        """
+        if sname not in self.slot_uris:
+            self.slot_uris[sname] = URIRef(self.sv.get_uri(sname, expand=True))
+        return self.slot_uris[sname]
+
+    def n3(self, term: Node) -> str:
+        """
+        Returns the Turtle representation of an IRI or literal
+        """
+        if term not in self.terms:
+            self.terms[term] = term.n3(self.namespace_manager)
+        return self.terms[term]
+
+    def text(self, value: str, element: Any) -> str:
+        """
+        Returns a title or description as a Turtle literal, tagged with the element's `in_language` if it has one
+        """
+        language = (getattr(element, "in_language", None) or "").strip() or None
+        return self.n3(Literal(value, lang=language))
+
+    def collection(self, items: Iterable[Node]) -> str:
+        items = [self.n3(item) for item in items]
+        # An empty rdflib `Collection` has no triples at all, rather than being `rdf:nil`
+        return f"( {' '.join(items)} )" if items else "[ ]"
+
+    def node(self, pairs: Iterable[str]) -> str:
+        return f"[ {' ; '.join(pairs)} ]"
+
+    def induction_keys(self, cname: ClassDefinitionName) -> dict[SlotDefinitionName, InductionKey]:
+        """
+        Returns the induction key of each of the slots of a class, following the same precedence as `SchemaView.induced_slot`
+        """
+        ancestors = self.sv.class_ancestors(cname, reflexive=True, mixins=True)
+        attributes: dict[str, ClassDefinitionName] = {}
+        usages: defaultdict[str, list[ClassDefinitionName]] = defaultdict(list)
+        for ancestor in ancestors:
+            for aname in self.all_classes[ancestor].attributes:
+                attributes.setdefault(aname, ancestor)
+        for ancestor in reversed(ancestors):
+            for sname in self.all_classes[ancestor].slot_usage:
+                usages[sname].append(ancestor)
+        return {
+            sname: (sname, attributes.get(sname), tuple(usages[sname]))
+            for sname in self.sv.class_slots(cname)
+        }
+
+    def induced_slot(self, key: InductionKey, cname: ClassDefinitionName) -> SlotDefinition:
+        """
+        Returns a slot as induced for a class, which is the same for every class whose slot has the same induction key
+        """
+        if key not in self.induced:
+            self.induced[key] = self.sv.induced_slot(key[0], cname)
+        return self.induced[key]
+
+    def property_shape(self, key: InductionKey, cname: ClassDefinitionName) -> PropertyShape:
+        """
+        Returns the property shape of a slot, which is shared by every class whose slot has the same induction key
+        """
+        if key in self.properties:
+            return self.properties[key]
+        sv = self.sv
+        s = self.induced_slot(key, cname)
+        if s.name in sv.element_by_schema_map():
+            path = URIRef(sv.get_uri(s, expand=True))
+        else:
+            path = URIRef(sv.expand_curie(f"{sv.schema.default_prefix}:{underscore(s.name)}"))
+
+        body = [f"{self.n3(SH.path)} {self.n3(path)}"]
+        if s.title is not None:
+            body.append(f"{self.n3(SH.name)} {self.text(s.title, s)}")
+        if s.description is not None:
+            body.append(f"{self.n3(SH.description)} {self.text(s.description, s)}")
+
+        if s.minimum_cardinality is not None:
+            body.append(f"{self.n3(SH.minCount)} {self.n3(Literal(s.minimum_cardinality))}")
+        elif s.exact_cardinality is not None:
+            body.append(f"{self.n3(SH.minCount)} {self.n3(Literal(s.exact_cardinality))}")
+        # Identifiers are the node's IRI rather than a property of it
+        elif s.required and not s.identifier:
+            body.append(f"{self.n3(SH.minCount)} {self.n3(Literal(1))}")
+        if s.maximum_cardinality is not None:
+            body.append(f"{self.n3(SH.maxCount)} {self.n3(Literal(s.maximum_cardinality))}")
+        elif s.exact_cardinality is not None:
+            body.append(f"{self.n3(SH.maxCount)} {self.n3(Literal(s.exact_cardinality))}")
+        elif not s.multivalued:
+            body.append(f"{self.n3(SH.maxCount)} {self.n3(Literal(1))}")
+        if s.minimum_value is not None:
+            body.append(f"{self.n3(SH.minInclusive)} {self.n3(Literal(s.minimum_value))}")
+        if s.maximum_value is not None:
+            body.append(f"{self.n3(SH.maxInclusive)} {self.n3(Literal(s.maximum_value))}")
+
+        if s.any_of:
+            if s.equals_string or s.equals_string_in:
+                raise ValueError(f"Slot {s.name}: 'equals_string'/'equals_string_in' and 'any_of' are mutually exclusive")
+            body.append(f"{self.n3(SH['or'])} ( {' '.join(self.node(self.range_constraints(alternative.range, node_kind=False)) for alternative in s.any_of)} )")
+        else:
+            if s.equals_number is not None:
+                body.append(f"{self.n3(SH.hasValue)} {self.n3(Literal(s.equals_number))}")
+            if (s.equals_string or s.equals_string_in) and s.range != "string":
+                raise ValueError(f"Slot {path}: 'equals_string' and 'equals_string_in' require range 'string' and not '{s.range}'")
+            body += self.range_constraints(s.range, node_kind=True)
+            if s.pattern:
+                body.append(f"{self.n3(SH.pattern)} {self.n3(Literal(s.pattern))}")
+            if s.equals_string:
+                body.append(f"{self.n3(SH['in'])} {self.collection([Literal(s.equals_string)])}")
+            if s.equals_string_in:
+                body.append(f"{self.n3(SH['in'])} {self.collection(Literal(value) for value in s.equals_string_in)}")
+            if s.subproperty_of:
+                values = self.subproperty_values(s)
+                if values:
+                    term = URIRef if self.is_uri_range(s.range) else Literal
+                    body.append(f"{self.n3(SH['in'])} {self.collection(term(value) for value in values)}")
+
+        self.properties[key] = PropertyShape(slot=s, path=path, body=body)
+        return self.properties[key]
+
+    def is_uri_range(self, r: str | None) -> bool:
+        """
+        Returns true if the values of a range are URIs or CURIEs
+        """
+        if r is None:
+            return False
+        return r in URI_TYPES or (r in self.sv.all_types() and not URI_TYPES.isdisjoint(self.sv.type_ancestors(r)))
+
+    def subproperty_values(self, s: SlotDefinition) -> list[str]:
+        """
+        Returns the values allowed by the `subproperty_of` of a slot, which are the parent slot and all of its descendants.
+        These are the slots' URIs if the slot's range is a URI type, and otherwise their names.
+        """
+        descendants = self.sv.slot_descendants(s.subproperty_of, reflexive=True)
+        if self.is_uri_range(s.range):
+            values = [self.sv.get_uri(self.sv.get_slot(sname), expand=True) for sname in descendants]
+        else:
+            values = [underscore(sname) for sname in descendants]
+        return sorted(set(values))
+
+    def range_constraints(self, r: str | None, node_kind: bool) -> list[str]:
+        """
+        Returns the constraints that restrict values to the range `r`.
+
+        Params:
+            node_kind: If true, class ranges also constrain the kind of node, which `ShaclGenerator` omits inside `sh:or`
+        """
+        key = f"{r}:{node_kind}"
+        if key in self.ranges:
+            return self.ranges[key]
+        sv = self.sv
+        constraints = []
+        if r in self.all_classes:
+            is_any = getattr(self.all_classes[r], "class_uri", None) == "linkml:Any"
+            range_ref = sv.get_uri(r, expand=True)
+            if not is_any and range_ref != LINKML_ANY_URI:
+                constraints.append(f"{self.n3(SH['class'])} {self.n3(URIRef(range_ref))}")
+            if node_kind and not is_any:
+                constraints.append(f"{self.n3(SH.nodeKind)} {self.n3(SH.IRI)}" if self.identifier_slot(r) is not None else f"{self.n3(SH.nodeKind)} {self.n3(SH.BlankNodeOrIRI)}")
+        elif r in sv.all_types():
+            t = sv.induced_type(r)
+            expanded = sv.get_uri(t, expand=True) if t.uri else None
+            if t.uri and (t.uri in NON_LITERAL_TYPE_URIS or expanded in NON_LITERAL_TYPE_URIS):
+                constraints.append(f"{self.n3(SH.nodeKind)} {self.n3(SH.IRI)}" if t.uri in IRI_ONLY_TYPE_URIS else f"{self.n3(SH.nodeKind)} {self.n3(SH.BlankNodeOrIRI)}")
+            elif t.uri:
+                constraints.append(f"{self.n3(SH.nodeKind)} {self.n3(SH.Literal)}")
+                constraints.append(f"{self.n3(SH.datatype)} {self.n3(URIRef(expanded))}")
+                if t.pattern:
+                    constraints.append(f"{self.n3(SH.pattern)} {self.n3(Literal(t.pattern))}")
+        elif r in sv.all_enums():
+            enum = sv.get_enum(r)
+            constraints.append(f"{self.n3(SH['in'])} " + self.collection(
+                URIRef(sv.expand_curie(pv.meaning)) if pv.meaning else Literal(pv_name)
+                for pv_name, pv in enum.permissible_values.items()
+            ))
+        else:
+            if r in BUILTIN_DATATYPES:
+                constraints.append(f"{self.n3(SH.datatype)} {self.n3(BUILTIN_DATATYPES[r])}")
+        self.ranges[key] = constraints
+        return constraints
+
+    def identifier_slot(self, cname: ClassDefinitionName) -> SlotDefinition | None:
+        """
+        Equivalent to `SchemaView.get_identifier_slot`, but reuses the induced slots
+        """
+        if cname not in self.identifiers:
+            keys = self.induction_keys(cname)
+            slots = (self.induced_slot(keys[sname], cname) for sname in sorted(keys))
+            self.identifiers[cname] = next((slot for slot in slots if slot.identifier), None)
+        return self.identifiers[cname]
+
+    def child_slot_uris(self, cname: ClassDefinitionName) -> set[URIRef]:
+        """
+        Returns the URIs of the slots of all `is_a` descendants of a class
+        """
+        if cname not in self.descendant_slot_uris:
+            uris: set[URIRef] = set()
+            for child in self.sv.class_children(cname, imports=True, mixins=False, is_a=True):
+                uris.update(self.slot_uri(sname) for sname in self.sv.class_slots(child))
+                uris.update(self.child_slot_uris(child))
+            self.descendant_slot_uris[cname] = uris
+        return self.descendant_slot_uris[cname]
+
+    def class_shape(self, c: ClassDefinition) -> str:
+        """
+        Returns the node shape of a class, as Turtle
+        """
+        sv = self.sv
+        class_uri = URIRef(sv.get_uri(c, expand=True))
+        pairs = [
+            f"a {self.n3(SH.NodeShape)}",
+            f"{self.n3(SH.targetClass)} {self.n3(class_uri)}",
+            f"{self.n3(SH.closed)} {'false' if c.mixin or c.abstract else 'true'}",
+        ]
+        if c.title is not None:
+            pairs.append(f"{self.n3(RDFS.label)} {self.text(c.title, c)}")
+        if c.description is not None:
+            pairs.append(f"{self.n3(RDFS.comment)} {self.text(c.description, c)}")
+
+        ignored = self.child_slot_uris(c.name) - {self.slot_uri(sname) for sname in sv.class_slots(c.name)}
+        ignored.add(RDF.type)
+        pairs.append(f"{self.n3(SH.ignoredProperties)} {self.collection(sorted(ignored, key=str))}")
+
+        for order, key in enumerate(self.induction_keys(c.name).values()):
+            shape = self.property_shape(key, c.name)
+            body = [*shape.body, f"{self.n3(SH.order)} {order}"]
+            default = default_value(sv, shape.slot, c)
+            # As in `ShaclGenerator`, falsy defaults such as `0` and `false` are left out
+            if default:
+                body.append(f"{self.n3(SH.defaultValue)} {self.n3(default)}")
+            pairs.append(f"{self.n3(SH.property)} {self.node(body)}")
+
+        pairs += self.rule_constraints(c)
+        separator = " ;\n    "
+        return f"{self.n3(class_uri)} {separator.join(pairs)} .\n"
+
+    def rule_constraints(self, c: ClassDefinition) -> list[str]:
+        """
+        Translates the `rules` of a class into SPARQL constraints, in the same way as `ShaclGenerator`.
+        Rules that don't match one of the patterns it recognises are skipped.
+        """
+        constraints = []
+        for rule in c.rules:
+            if rule.deactivated:
+                continue
+            if rule.bidirectional:
+                logger.warning(f"Skipping a rule of {c.name}, because SHACL constraints can't represent bidirectional rules")
+                continue
+            if rule.open_world:
+                logger.warning(f"A rule of {c.name} is open world, but SHACL constraints are checked under a closed world")
+            if rule.elseconditions:
+                logger.warning(f"Only the preconditions and postconditions of a rule of {c.name} are translated, and not its elseconditions")
+            query = self.rule_query(c, rule)
+            if query is None:
+                logger.debug(f"Skipping a rule of {c.name}, whose pattern isn't supported")
+                continue
+            pairs = [f"a {self.n3(SH.SPARQLConstraint)}"]
+            if rule.description:
+                pairs.append(f"{self.n3(SH.message)} {self.n3(Literal(rule.description))}")
+            pairs.append(f"{self.n3(SH.select)} {self.n3(Literal(query))}")
+            constraints.append(f"{self.n3(SH.sparql)} {self.node(pairs)}")
+        return constraints
+
+    def rule_query(self, c: ClassDefinition, rule: ClassRule) -> str | None:
+        """
+        Returns a SPARQL query that selects the nodes that violate a rule, or `None` if the rule isn't one of these patterns:
+
+        * A boolean guard, where a slot that has a value requires a flag slot to be `"true"`
+        * An exclusive value, where a slot that has a certain value can have at most `maximum_cardinality` values
+        """
+        if not rule.preconditions or not rule.postconditions:
+            return None
+        pre_slots = rule.preconditions.slot_conditions or {}
+        post_slots = rule.postconditions.slot_conditions or {}
+        if len(pre_slots) != 1 or len(post_slots) != 1:
+            return None
+        (pre_name, pre), = pre_slots.items()
+        (post_name, post), = post_slots.items()
+
+        if pre.value_presence == PresenceEnum(PresenceEnum.PRESENT) and post.equals_string == "true":
+            flag_uri, value_uri = self.rule_slot_uri(post_name), self.rule_slot_uri(pre_name)
+            return (
+                f"SELECT $this WHERE {{\n"
+                f"    OPTIONAL {{ $this <{flag_uri}> ?flag . }}\n"
+                f"    OPTIONAL {{ $this <{value_uri}> ?value . }}\n"
+                f"    FILTER (\n"
+                f'        ( !BOUND(?flag) || str(?flag) != "true" ) &&\n'
+                f"        BOUND(?value)\n"
+                f"    )\n"
+                f"}}"
+            )
+
+        if pre.equals_string is not None and post.maximum_cardinality is not None and pre_name == post_name:
+            slot_uri = self.rule_slot_uri(pre_name)
+            value = self.rule_value(pre_name, pre.equals_string)
+            if int(post.maximum_cardinality) == 1:
+                return (
+                    f"SELECT $this WHERE {{\n"
+                    f"    $this <{slot_uri}> {value} .\n"
+                    f"    $this <{slot_uri}> ?other .\n"
+                    f"    FILTER (?other != {value})\n"
+                    f"}}"
+                )
+            return (
+                f"SELECT $this WHERE {{\n"
+                f"    $this <{slot_uri}> {value} .\n"
+                f"    {{\n"
+                f"        SELECT $this (COUNT(?val) AS ?count)\n"
+                f"        WHERE {{ $this <{slot_uri}> ?val . }}\n"
+                f"        GROUP BY $this\n"
+                f"        HAVING (?count > {int(post.maximum_cardinality)})\n"
+                f"    }}\n"
+                f"}}"
+            )
+        return None
+
+    def rule_slot_uri(self, sname: str) -> str:
+        """
+        Returns the IRI of a slot that is used in a rule
+        """
+        sv = self.sv
+        slot = sv.get_slot(sname)
+        if slot and sname in sv.element_by_schema_map():
+            return sv.get_uri(slot, expand=True)
+        return sv.expand_curie(f"{sv.schema.default_prefix}:{underscore(sname)}")
+
+    def rule_value(self, sname: str, value: str) -> str:
+        """
+        Returns a value of a slot that is used in a rule, as a SPARQL term.
+        Enum values with a `meaning` are IRIs, and anything else is a string.
+        """
+        sv = self.sv
+        slot = sv.get_slot(sname)
+        if slot and slot.range in sv.all_enums():
+            pv = sv.get_enum(slot.range).permissible_values.get(value)
+            if pv and pv.meaning:
+                return f"<{sv.expand_curie(pv.meaning)}>"
+        return f'"{value}"'
+
+    def serialize(self, **kwargs) -> str:
+        classes = self.all_classes.values()
+        if self.pruned:
+            reachable = mandatory(self.context, "Missing schema").reachable_classes
+            classes = [c for c in classes if c.name in reachable]
+        shapes = [self.class_shape(c) for c in classes]
+        prefixes = [f"@prefix {prefix}: <{namespace}> .\n" for prefix, namespace in self.namespace_manager.namespaces()]
+        return "".join(prefixes) + "\n" + "\n".join(shapes)
+
+if __name__ == "__main__":
+    cli()
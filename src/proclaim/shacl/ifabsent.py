@@ -0,0 +1,126 @@
+import re
+
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import types
+from linkml_runtime.linkml_model.meta import ClassDefinition, SlotDefinition
+from rdflib import Literal, URIRef
+from rdflib.namespace import XSD
+
+#: The built-in LinkML types, in the order in which `linkml_runtime` defines them
+BUILTIN_TYPES = [
+    t for t in types.__dict__.values()
+    if isinstance(t, type) and t.__module__ == types.__name__ and hasattr(t, "type_name")
+]
+
+#: Parses an `ifabsent` value such as `string(draft)` or `true`
+IFABSENT = re.compile(r"""(?:(?P<type>\w+)\()?[\"\']?(?P<default_value>[^\(\)\"\')]*)[\"\']?\)?""")
+TIME = re.compile(r"^(\d{2}):(\d{2}):(\d{2}).*$")
+DATE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+DATETIME = re.compile(r"^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2}).*$")
+DATE_OR_DATETIME = re.compile(r"^(\d{4})-(\d{2})-(\d{2})(?:T(\d{2}):(\d{2}):(\d{2}))?.*$")
+
+#: Datatypes of the defaults of numeric types, whose values are used as they are written
+NUMERIC_DATATYPES = {
+    "integer": XSD.integer,
+    "float": XSD.float,
+    "double": XSD.double,
+    "decimal": XSD.decimal,
+}
+
+def base_type(sv: SchemaView, range_: str | None) -> str | None:
+    """
+    Returns the name of the built-in type that a range is, or derives from, or `None` if it isn't a type
+    """
+    for typ in BUILTIN_TYPES:
+        if range_ == typ.type_name:
+            return typ.type_name
+    if range_ not in sv.all_types(imports=True):
+        return None
+    # Built-in types don't derive from each other, so the last ancestor is a built-in type if any is
+    ancestor = sv.type_ancestors(range_)[-1]
+    for typ in BUILTIN_TYPES:
+        if ancestor == typ.type_name:
+            return typ.type_name
+    induced = sv.induced_type(range_)
+    if induced.repr is None and induced.base is None:
+        return None
+    for typ in BUILTIN_TYPES:
+        if typ.__mro__[1].__name__ == induced.base:
+            return typ.type_name
+    return None
+
+def default_value(sv: SchemaView, slot: SlotDefinition, cls: ClassDefinition) -> Literal | None:
+    """
+    Returns the `sh:defaultValue` of a slot of `cls`, from its `ifabsent`, as `ShaclGenerator` writes it
+
+    Raises:
+        ValueError: If the `ifabsent` value isn't valid for the slot's range
+    """
+    if not slot.ifabsent:
+        return None
+    value = IFABSENT.search(slot.ifabsent).group("default_value")
+    if value == "default_range":
+        return Literal(sv.schema.default_range or "string", datatype=XSD.string)
+
+    def invalid(kind: str) -> ValueError:
+        return ValueError(f"The ifabsent value `{slot.ifabsent}` of the `{slot.name}` slot does not match a valid {kind} value")
+
+    name = base_type(sv, slot.range)
+    if name == "string":
+        return Literal(value, datatype=XSD.string)
+    if name == "boolean":
+        if re.match(r"^[Tt]rue$", value):
+            return Literal(True, datatype=XSD.boolean)
+        if re.match(r"^[Ff]alse$", value):
+            return Literal(False, datatype=XSD.boolean)
+        raise invalid("boolean")
+    if name in NUMERIC_DATATYPES:
+        return Literal(value, datatype=NUMERIC_DATATYPES[name])
+    if name == "time":
+        if (parts := TIME.match(value)) is None:
+            raise invalid("time")
+        return Literal(":".join(parts.groups()), datatype=XSD.time)
+    if name in ("date", "datetime", "date_or_datetime"):
+        parts = {"date": DATE, "datetime": DATETIME, "date_or_datetime": DATE_OR_DATETIME}[name].match(value)
+        if parts is None:
+            raise invalid(name.replace("_", " "))
+        date, time = parts.groups()[:3], parts.groups()[3:]
+        if not time or None in time:
+            return Literal("-".join(date), datatype=XSD.date)
+        return Literal(f"{'-'.join(date)}T{':'.join(time)}", datatype=XSD.dateTime)
+    if name == "uri":
+        return Literal(special_uri(sv, value, slot, cls), datatype=XSD.anyURI)
+    if name == "curie":
+        return Literal(special_curie(sv, value, slot, cls), datatype=XSD.string)
+    if name == "uriorcurie":
+        if value in ("class_curie", "slot_curie"):
+            return Literal(special_curie(sv, value, slot, cls), datatype=XSD.string)
+        if value in ("class_uri", "slot_uri"):
+            return Literal(special_uri(sv, value, slot, cls), datatype=XSD.anyURI)
+        return Literal(URIRef(sv.expand_curie(value)), datatype=XSD.anyURI)
+    if name is not None:
+        raise NotImplementedError(f"ifabsent values of type {name} can't be converted to SHACL")
+
+    if slot.range in sv.all_enums() and value in sv.get_enum(slot.range).permissible_values:
+        return Literal(value)
+    raise ValueError(f"The ifabsent value `{slot.ifabsent}` of the `{slot.name}` slot could not be processed")
+
+def special_uri(sv: SchemaView, value: str, slot: SlotDefinition, cls: ClassDefinition) -> str:
+    """
+    Expands the `class_uri` and `slot_uri` placeholders, and returns any other value unchanged
+    """
+    if value == "class_uri":
+        return str(sv.get_uri(cls, expand=True))
+    if value == "slot_uri":
+        return str(sv.get_uri(slot, expand=True))
+    return value
+
+def special_curie(sv: SchemaView, value: str, slot: SlotDefinition, cls: ClassDefinition) -> str:
+    """
+    Expands the `class_curie` and `slot_curie` placeholders, and returns any other value unchanged
+    """
+    if value == "class_curie":
+        return str(sv.get_uri(cls, expand=False))
+    if value == "slot_curie":
+        return str(sv.get_uri(slot, expand=False))
+    return value
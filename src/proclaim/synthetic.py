@@ -0,0 +1,139 @@
+"""
+Generates synthetic LinkML schemas that proclaim can convert, for reproducing how it scales to large profiles.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from random import Random
+from typing import Any
+
+import click
+from linkml_runtime.utils.schema_builder import SchemaBuilder
+from linkml_runtime.dumpers import YAMLDumper
+from linkml_runtime.linkml_model import ClassDefinition, SchemaDefinition, SlotDefinition
+
+#: Words that synthetic descriptions are made of
+WORDS = "the a profile crate entity describes each of its data files software workflow run with input output parameter value".split()
+
+@dataclass
+class SyntheticSchema:
+    """
+    Parameters of a synthetic profile schema.
+    Each schema has the metadata that proclaim requires, and each slot has a `slot_uri` and a description.
+    The same parameters always generate the same schemas.
+    """
+    classes: int = 100
+    "Total number of classes, across the schema and its imports"
+    slots: int = 100
+    "Number of slots, which are all defined in the first schema, and are shared by every class"
+    slots_per_class: int = 5
+    "Number of slots that each class uses directly, in addition to the slots it inherits"
+    depth: int = 3
+    "Number of `is_a` parents in the longest chain of ancestors"
+    slot_usage: float = 0.1
+    "Fraction of classes that refine one of their slots using `slot_usage`"
+    class_ranges: float = 0.2
+    "Fraction of slots whose range is a class rather than a string"
+    imports: int = 0
+    "Number of imported schemas that the classes are spread across, in addition to the main schema"
+    description_words: int = 10
+    "Number of words in each description"
+    seed: int = 0
+    "Seed for the random choices, such as which slots each class uses"
+    name: str = "Synthetic"
+    "Name of the main schema. The imported schemas are named after it."
+
+    def schema_name(self, index: int) -> str:
+        return self.name if index == self.imports else f"{self.name}_import_{index}"
+
+    def description(self, random: Random) -> str:
+        return " ".join(random.choice(WORDS) for _ in range(self.description_words)).capitalize()
+
+    def builder(self, index: int, random: Random) -> SchemaBuilder:
+        """
+        Creates an empty schema with the metadata that proclaim requires, which imports the schema before it
+        """
+        name = self.schema_name(index)
+        builder = SchemaBuilder(name=name, id=f"https://example.org/{name}")
+        builder.add_defaults()
+        builder.add_prefix("synth", "https://example.org/synthetic/")
+        if index > 0:
+            builder.schema.imports.append(f"./{self.schema_name(index - 1)}")
+        builder.schema.description = self.description(random)
+        builder.schema.license = "MIT"
+        builder.schema.version = "0.0.1"
+        builder.schema.created_by = "https://github.com/WEHI-SODA-Hub/proclaim"
+        return builder
+
+    def schemas(self) -> list[SchemaDefinition]:
+        """
+        Generates the schemas, from the first import to the main schema, which comes last.
+        Each schema imports the one before it, so the main schema can see every class and slot.
+        """
+        random = Random(self.seed)
+        builders = [self.builder(index, random) for index in range(self.imports + 1)]
+        # Classes are split into contiguous blocks, so each parent is in the same schema as its child, or the one before it
+        schema_of = [i * len(builders) // max(self.classes, 1) for i in range(self.classes)]
+        # Class ranges can only refer to classes that the first schema can see
+        first_classes = [f"Class{i}" for i in range(self.classes) if schema_of[i] == 0]
+
+        for i in range(self.slots):
+            builders[0].add_slot(SlotDefinition(
+                f"slot{i}",
+                slot_uri=f"synth:slot{i}",
+                description=self.description(random),
+                range=random.choice(first_classes) if first_classes and random.random() < self.class_ranges else "string",
+                multivalued=random.random() < 0.5,
+            ))
+
+        for i in range(self.classes):
+            slots = random.sample(range(self.slots), min(self.slots_per_class, self.slots))
+            # Classes form chains of `depth` + 1 classes, each of which is the parent of the next
+            parent = f"Class{i - 1}" if i % (self.depth + 1) else None
+            slot_usage: dict[str, Any] = {}
+            if slots and random.random() < self.slot_usage:
+                refined = f"slot{random.choice(slots)}"
+                slot_usage[refined] = SlotDefinition(refined, description=self.description(random), required=True)
+            builders[schema_of[i]].add_class(ClassDefinition(
+                f"Class{i}",
+                class_uri=f"synth:Class{i}",
+                description=self.description(random),
+                is_a=parent,
+                slots=[f"slot{slot}" for slot in slots],
+                slot_usage=slot_usage,
+            ))
+
+        return [builder.schema for builder in builders]
+
+    def write(self, directory: Path) -> Path:
+        """
+        Writes the schemas to a directory as YAML
+
+        Returns:
+            The path of the main schema
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        dumper = YAMLDumper()
+        for schema in self.schemas():
+            dumper.dump(schema, str(directory / f"{schema.name}.yaml"))
+        return directory / f"{self.name}.yaml"
+
+@click.command()
+@click.option("--output-dir", "-o", type=click.Path(file_okay=False, path_type=Path), required=True, help="Directory into which the schemas are written")
+@click.option("--classes", type=int, default=SyntheticSchema.classes, show_default=True, help="Total number of classes")
+@click.option("--slots", type=int, default=SyntheticSchema.slots, show_default=True, help="Number of slots shared by the classes")
+@click.option("--slots-per-class", type=int, default=SyntheticSchema.slots_per_class, show_default=True, help="Number of slots that each class uses directly")
+@click.option("--depth", type=int, default=SyntheticSchema.depth, show_default=True, help="Number of is_a parents in the longest chain of ancestors")
+@click.option("--slot-usage", type=float, default=SyntheticSchema.slot_usage, show_default=True, help="Fraction of classes that refine a slot using slot_usage")
+@click.option("--class-ranges", type=float, default=SyntheticSchema.class_ranges, show_default=True, help="Fraction of slots whose range is a class")
+@click.option("--imports", type=int, default=SyntheticSchema.imports, show_default=True, help="Number of imported schemas that the classes are spread across")
+@click.option("--description-words", type=int, default=SyntheticSchema.description_words, show_default=True, help="Number of words in each description")
+@click.option("--seed", type=int, default=SyntheticSchema.seed, show_default=True, help="Seed for the random choices")
+@click.option("--name", default=SyntheticSchema.name, show_default=True, help="Name of the main schema")
+def cli(output_dir: Path, **kwargs: Any):
+    """
+    Generates a synthetic profile schema, along with the schemas it imports
+    """
+    print(SyntheticSchema(**kwargs).write(output_dir))
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,103 @@
+"""
+Records the resources used by each step of a build, as a tree of nested steps.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter, process_time
+from typing import Any, Iterator
+import sys
+
+@dataclass
+class Step:
+    """
+    Resources used by one step of a build, and by each of its sub-steps
+    """
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    "CPU time of the whole process, including any threads, while the step ran"
+    peak_rss_delta: int = 0
+    "Bytes by which the step raised the peak resident set size of the process. This is 0 if the step used less memory than an earlier one."
+    output_bytes: int | None = None
+    "Total size of the step's output file or directory, if it has one"
+    steps: list["Step"] = field(default_factory=list)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss_delta": self.peak_rss_delta,
+            "output_bytes": self.output_bytes,
+            "steps": [step.to_json() for step in self.steps],
+        }
+
+#: The innermost step that is running in this context
+current_step: ContextVar[Step | None] = ContextVar("current_step", default=None)
+#: Whether steps record the size of their output. This walks the output once each step finishes, so it is only done when a report is wanted.
+measure_outputs: ContextVar[bool] = ContextVar("measure_outputs", default=False)
+
+def peak_rss() -> int:
+    """
+    Returns the peak resident set size of this process, in bytes, or 0 on platforms that can't report it, such as Windows
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, but macOS reports bytes
+    return usage if sys.platform == "darwin" else usage * 1024
+
+def output_size(path: Path) -> int:
+    """
+    Returns the size of a file, or the total size of the files in a directory
+    """
+    if path.is_dir():
+        return sum(child.stat().st_size for child in path.rglob("*") if child.is_file())
+    return path.stat().st_size
+
+@contextmanager
+def timed(name: str, output: Path | None = None) -> Iterator[Step]:
+    """
+    Records the resources used by the enclosed code as a step, which is added to the step that encloses it, if any
+
+    Params:
+        output: File or directory written by the step, whose size is recorded once the step finishes if `measure_outputs` is set
+    """
+    parent = current_step.get()
+    step = Step(name)
+    token = current_step.set(step)
+    wall, cpu, rss = perf_counter(), process_time(), peak_rss()
+    try:
+        yield step
+    finally:
+        current_step.reset(token)
+        step.wall_seconds = perf_counter() - wall
+        step.cpu_seconds = process_time() - cpu
+        step.peak_rss_delta = peak_rss() - rss
+        if output is not None and measure_outputs.get() and output.exists():
+            step.output_bytes = output_size(output)
+        if parent is not None:
+            parent.steps.append(step)
+
+@contextmanager
+def measuring_outputs(enabled: bool = True) -> Iterator[None]:
+    """
+    Sets whether the steps recorded by the enclosed code measure the size of their output
+    """
+    token = measure_outputs.set(enabled)
+    try:
+        yield
+    finally:
+        measure_outputs.reset(token)
+
+def add_steps(steps: list[Step]) -> None:
+    """
+    Adds steps that were recorded elsewhere, such as in a worker process, to the current step
+    """
+    parent = current_step.get()
+    if parent is not None:
+        parent.steps.extend(steps)
@@ -1,5 +1,10 @@
-from pathlib import Path
-from typing import TypeVar
+from concurrent.futures import ProcessPoolExecutor
+import json
+from multiprocessing import get_all_start_methods, get_context
+import shutil
+from pathlib import Path, PurePath
+from typing import Any, Callable, Iterable, NamedTuple, Sequence, TextIO, TypeVar
+from zipfile import ZipFile
 from linkml_runtime.linkml_model import Element, SlotDefinition, SlotDefinitionName
 from rdflib import Graph, URIRef
 from rdfcrate import uris
@@ -42,3 +47,120 @@ def domain(slot: SlotDefinition) -> set[SlotDefinitionName]:
 
 def remove_newlines(s: str) -> str:
     return s.replace("\n", " ")
+
+#: Linux ioctl that makes a file share the data blocks of another file, which copy-on-write filesystems support
+FICLONE = 0x40049409
+
+def clone_file(source: Path, destination: Path) -> None:
+    """
+    Copies a file byte-for-byte.
+    On filesystems that support reflinks, such as Btrfs and XFS, the copy shares its data with the source until either is modified, so no data is written.
+    Otherwise this falls back to a regular copy.
+    """
+    try:
+        import fcntl
+        with source.open("rb") as src, destination.open("wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copymode(source, destination)
+    except (ImportError, OSError):
+        shutil.copyfile(source, destination)
+
+def add_tree(archive: ZipFile, source: Path, destination: PurePath) -> None:
+    """
+    Adds every file in a directory to a zip file, under the `destination` directory of the archive
+    """
+    for path in sorted(source.rglob("*")):
+        if path.is_file():
+            archive.write(path, (destination / path.relative_to(source)).as_posix())
+
+def move_tree(source: Path, destination: Path) -> None:
+    """
+    Moves the contents of a directory into `destination`, merging them with any directories that already exist there and replacing any files.
+    Entries are renamed rather than copied, so a subdirectory that doesn't exist in `destination` yet is moved in one step.
+    Copying is only a fallback for when the two directories are on different filesystems.
+    """
+    destination.mkdir(parents=True, exist_ok=True)
+    for path in source.iterdir():
+        target = destination / path.name
+        if target.is_dir() and not target.is_symlink():
+            if path.is_dir():
+                move_tree(path, target)
+                continue
+            shutil.rmtree(target)
+        # Tries a rename first, and copies if that fails
+        shutil.move(path, target)
+
+#: The function that `run_forked` is applying, which forked worker processes inherit rather than receiving it pickled
+_forked_task: Callable[[Any], None] | None = None
+
+def _run_forked_batch(batch: Sequence[Any]) -> None:
+    task = mandatory(_forked_task, "Worker process wasn't forked by run_forked")
+    for item in batch:
+        task(item)
+
+def run_forked(func: Callable[[T], None], items: Sequence[T], jobs: int, batch_size: int) -> None:
+    """
+    Calls `func` on every item, splitting the items into batches that are shared between `jobs` worker processes.
+    The workers are forked, so `func` and everything that it refers to, such as a warmed `SchemaContext` and compiled templates, are inherited rather than loaded again.
+    Only the items are sent to the workers, and nothing is sent back, so `func` must only write its own output files.
+    The items are processed in this process instead if `jobs` is 1, if they fit in one batch, or if the platform can't fork.
+    """
+    global _forked_task
+    if jobs <= 1 or len(items) <= batch_size or "fork" not in get_all_start_methods():
+        for item in items:
+            func(item)
+        return
+    _forked_task = func
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=get_context("fork")) as pool:
+            # Consume the results so that exceptions are raised here
+            for _ in pool.map(_run_forked_batch, [items[i:i + batch_size] for i in range(0, len(items), batch_size)]):
+                pass
+    finally:
+        _forked_task = None
+
+class JsonObject(NamedTuple):
+    """
+    A JSON object whose members are only generated while it is being written by `write_json`
+    """
+    members: Iterable[tuple[str, Any]]
+
+class JsonArray(NamedTuple):
+    """
+    A JSON array whose items are only generated while it is being written by `write_json`
+    """
+    items: Iterable[Any]
+
+def write_json(file: TextIO, value: Any, indent: int | None = None, *, sort_keys: bool = False, level: int = 0) -> None:
+    """
+    Writes a value to a file as JSON, in the same format as `json.dump`.
+    `JsonObject` and `JsonArray` members are generated and written one at a time, so the whole document is never held in memory.
+
+    Params:
+        indent: Number of spaces per level of indentation. If `None`, the JSON is written compactly, without any whitespace.
+        sort_keys: If true, sort the keys of each object that is written in one piece
+        level: Indentation level of `value` itself
+    """
+    item_separator, key_separator = (",", ":") if indent is None else (",", ": ")
+    if isinstance(value, (JsonObject, JsonArray)):
+        opening, closing = ("{", "}") if isinstance(value, JsonObject) else ("[", "]")
+        file.write(opening)
+        empty = True
+        for member in (value.members if isinstance(value, JsonObject) else value.items):
+            file.write("" if empty else item_separator)
+            empty = False
+            if indent is not None:
+                file.write("\n" + " " * (indent * (level + 1)))
+            if isinstance(value, JsonObject):
+                key, member = member
+                file.write(json.dumps(key, ensure_ascii=False) + key_separator)
+            write_json(file, member, indent, sort_keys=sort_keys, level=level + 1)
+        if indent is not None and not empty:
+            file.write("\n" + " " * (indent * level))
+        file.write(closing)
+    else:
+        text = json.dumps(value, indent=indent, separators=(item_separator, key_separator), sort_keys=sort_keys, ensure_ascii=False)
+        if indent is not None and level > 0:
+            # Strings can't contain raw newlines, so every newline starts a new line of indentation
+            text = text.replace("\n", "\n" + " " * (indent * level))
+        file.write(text)
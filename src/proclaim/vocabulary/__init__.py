@@ -1,5 +1,9 @@
 from pathlib import Path
+from shutil import rmtree
+from typing import Callable, Iterable
 from proclaim.mkdocs_generator import MkDocsGenerator
+from proclaim.schema_context import SchemaContext
+from proclaim.util import run_forked
 from importlib.resources import files
 from linkml_runtime import SchemaView
 
@@ -9,16 +13,77 @@ class VocabularyHtmlGenerator(MkDocsGenerator):
     Rather, they act as a description of each class and property in the schema, independent of the profile.
     The intention is that the IRIs of the classes and properties should resolve to these pages, which can be used in other RDF scenarios that don't even necessarily relate to RO-Crate.
     """
+    def write_property(self, markdown_dir: Path, sname: str) -> None:
+        self.write_markdown((markdown_dir / "properties" / sname).with_suffix(".md"), files("proclaim.vocabulary") / "property.jinja2", slot=self.context.slots[sname], sname=sname)
+
+    def write_class(self, markdown_dir: Path, cname: str) -> None:
+        self.write_markdown((markdown_dir / "classes" / cname).with_suffix(".md"), files("proclaim.vocabulary") / "class.jinja2", cls=self.context.classes[cname], cname=cname)
+
     def make_markdown(self, markdown_dir: Path, sv: SchemaView) -> None:
-        package_files = files("proclaim.vocabulary")
+        # Computing induced slots fills in the `domain_of` of each slot, which the property pages list as its domain,
+        # so this has to happen first, whether or not the context was shared with other generators
+        self.context.warm()
         (markdown_dir / "index.md").touch()
+        (markdown_dir / "properties").mkdir()
+        (markdown_dir / "classes").mkdir()
+
+        # Compile the templates before any worker processes are forked, so that they inherit them
+        self.get_template(files("proclaim.vocabulary") / "property.jinja2")
+        self.get_template(files("proclaim.vocabulary") / "class.jinja2")
+        # Only the kind and name of each page are sent to the workers
+        writers: dict[str, Callable[[Path, str], None]] = {"property": self.write_property, "class": self.write_class}
+        pages = [
+            *(("property", sname) for sname in self.context.slots),
+            *(("class", cname) for cname in self.context.classes),
+        ]
+        run_forked(lambda page: writers[page[0]](markdown_dir, page[1]), pages, self.jobs, self.batch_size)
+
+    def update(self, directory: str, properties: Iterable[str], classes: Iterable[str]) -> None:
+        """
+        Re-renders some of the pages of a vocabulary that was previously written to `directory` by `serialize()`.
+        Pages for elements that no longer exist in the schema are deleted.
 
-        properties = markdown_dir / "properties"
-        properties.mkdir()
-        for sname, slot in sv.all_slots(imports=False).items():
-            self.write_markdown((properties / sname).with_suffix(".md"), package_files / "property.jinja2", slot=slot, sname=sname)
+        Params:
+            properties: Names of the slots whose pages should be updated
+            classes: Names of the classes whose pages should be updated
+        """
+        markdown_dir = Path(directory) / self.markdown_dir
+        html_dir = Path(directory) / self.html_dir
+        pages_changed = False
+        for subdir, names, elements, write in [
+            ("properties", properties, self.context.slots, self.write_property),
+            ("classes", classes, self.context.classes, self.write_class),
+        ]:
+            for name in names:
+                markdown = (markdown_dir / subdir / name).with_suffix(".md")
+                if name in elements:
+                    pages_changed |= not markdown.exists()
+                    write(markdown_dir, name)
+                else:
+                    pages_changed = True
+                    markdown.unlink(missing_ok=True)
+                    rmtree(html_dir / subdir / name, ignore_errors=True)
+        # Adding or removing pages changes the navigation of every page, so that needs a full build
+        self.write_html(markdown_dir, html_dir, dirty=not pages_changed)
 
-        classes = markdown_dir / "classes"
-        classes.mkdir()
-        for cname, cls in sv.all_classes(imports=False).items():
-            self.write_markdown((classes / cname).with_suffix(".md"), package_files / "class.jinja2", cls=cls, cname=cname)
+def affected_pages(old: SchemaContext, new: SchemaContext) -> tuple[set[str], set[str]]:
+    """
+    Finds the vocabulary pages that differ between two versions of a schema.
+    A property page only depends on its slot, but a class page depends on the class and all of its induced slots,
+    so a change to a slot or an ancestor's `slot_usage` affects every class that uses it.
+
+    Returns:
+        The names of the affected slots and classes, including ones that were added or removed
+    """
+    # Computing induced slots fills in the `domain_of` of each slot, so both schemas need to be in the same state
+    old.warm()
+    new.warm()
+    properties = {
+        sname for sname in old.slots.keys() | new.slots.keys()
+        if old.slots.get(sname) != new.slots.get(sname)
+    }
+    classes = {
+        cname for cname in old.classes.keys() | new.classes.keys()
+        if old.classes.get(cname) != new.classes.get(cname) or old.induced_slots.get(cname) != new.induced_slots.get(cname)
+    }
+    return properties, classes
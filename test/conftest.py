@@ -9,3 +9,7 @@ def process_run() -> str:
 @pytest.fixture
 def process_run_sv(process_run: str) -> SchemaView:
     return SchemaView(process_run)
+
+@pytest.fixture
+def features() -> str:
+    return str((Path(__file__).parent / "features.yaml").resolve())
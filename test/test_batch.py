@@ -0,0 +1,36 @@
+from pathlib import Path
+from proclaim.profile_crate.batch import BatchBuild, read_batch
+from proclaim.synthetic import SyntheticSchema
+
+
+def test_read_batch(tmp_path: Path):
+    for name in ["A", "B"]:
+        SyntheticSchema(classes=2, slots=2, name=name).write(tmp_path)
+    (tmp_path / "profiles.txt").write_text("# Profiles\nA.yaml\n\n*.yaml\n")
+    assert read_batch(str(tmp_path / "profiles.txt")) == [tmp_path / "A.yaml", tmp_path / "B.yaml"]
+    assert read_batch(str(tmp_path / "[B].yaml")) == [tmp_path / "B.yaml"]
+
+def test_batch_build(tmp_path: Path):
+    """
+    Every profile should be built into its own directory, and a broken schema shouldn't stop the others
+    """
+    schemas = [SyntheticSchema(classes=5, slots=5, imports=1, name=name).write(tmp_path / "schemas") for name in ["A", "B"]]
+    broken = tmp_path / "schemas" / "Broken.yaml"
+    broken.write_text("id: https://example.org/Broken\nname: Broken\n")
+    results = BatchBuild([*schemas, broken], tmp_path / "output", {"cache_dir": tmp_path / "cache", "renderer": "direct"}).run()
+    assert [result.schema for result in results] == [*schemas, broken]
+    assert [result.error is None for result in results] == [True, True, False]
+    for name in ["A", "B"]:
+        assert (tmp_path / "output" / name / "ro-crate-metadata.json").exists()
+
+def test_duplicate_stems(tmp_path: Path):
+    """
+    Schemas that would be written to the same directory should be a usage error rather than a crash
+    """
+    from click.testing import CliRunner
+    from proclaim.profile_crate.cli import cli
+    for directory in ["a", "b"]:
+        SyntheticSchema(classes=2, slots=2, name="A").write(tmp_path / directory)
+    result = CliRunner().invoke(cli, ["--batch", str(tmp_path / "*" / "A.yaml"), "--output-dir", str(tmp_path / "output")])
+    assert result.exit_code == 2
+    assert "More than one schema would be written to" in result.output
@@ -1,13 +1,17 @@
+from datetime import datetime
 import json
 from pathlib import Path
 import tempfile
+import pytest
 from proclaim.profile_crate.generator import ProfileCrateGenerator
+from proclaim.timings import measuring_outputs, timed
 
 
-def test_crate(process_run: str):
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_crate(process_run: str, jobs: int):
     with tempfile.TemporaryDirectory() as _output_dir:
         output_dir = Path(_output_dir)
-        ProfileCrateGenerator(process_run).serialize(str(output_dir))
+        ProfileCrateGenerator(process_run, jobs=jobs).serialize(str(output_dir))
 
         assert (output_dir / "ro-crate-metadata.json").exists()
         assert (output_dir / "index.html").exists()
@@ -34,3 +38,170 @@ def test_crate(process_run: str):
                 found_resource_descriptor = True
                 break
         assert found_resource_descriptor
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_streamed_metadata(process_run: str, tmp_path: Path, compact: bool):
+    """
+    Writing the crate metadata one entity at a time should describe the same graph as `crate.write()`
+    """
+    from rdflib import Graph
+    from rdflib.compare import isomorphic
+
+    generator = ProfileCrateGenerator(process_run, compact=compact)
+    crate = generator.make_crate(tmp_path)
+    generator.make_shacl(tmp_path, crate)
+    generator.write_metadata(crate)
+    streamed = (tmp_path / "ro-crate-metadata.json").read_text()
+    assert ("\n" in streamed) != compact
+    assert isomorphic(Graph().parse(data=streamed, format="json-ld"), Graph().parse(data=crate.compile(), format="json-ld"))
+
+def test_linkml_copies(process_run: str, tmp_path: Path):
+    """
+    Local schemas should be copied verbatim, and the merged schema should be reused from the cache
+    """
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    generator = ProfileCrateGenerator(process_run, cache_dir=tmp_path / "cache")
+    generator.make_linkml(output_dir, generator.make_crate(output_dir))
+    assert (output_dir / "linkml" / "ProcessRun.yml").read_bytes() == Path(process_run).read_bytes()
+    cached = list((tmp_path / "cache" / "merged").glob("*.yml"))
+    assert len(cached) == 1
+    assert cached[0].read_text() == (output_dir / "linkml" / "merged.yml").read_text()
+
+    generator = ProfileCrateGenerator(process_run, cache_dir=tmp_path / "cache", merge_schema=False)
+    generator.make_linkml(tmp_path, generator.make_crate(tmp_path))
+    assert not (tmp_path / "linkml" / "merged.yml").exists()
+
+def test_merged_schema_key(process_run: str, monkeypatch: pytest.MonkeyPatch):
+    """
+    Cached merged schemas shouldn't be reused by a different version of linkml_runtime
+    """
+    import proclaim.profile_crate.generator as generator_module
+    key = ProfileCrateGenerator(process_run).schema_key
+    monkeypatch.setattr(generator_module, "linkml_runtime_version", "0.0.0")
+    assert ProfileCrateGenerator(process_run).schema_key != key
+
+def test_timings_report(process_run: str, tmp_path: Path):
+    """
+    The timings report should have a step for every stage, including those run in worker processes
+    """
+    report_path = tmp_path / "timings.json"
+    ProfileCrateGenerator(process_run, renderer="direct", timings=report_path).serialize(str(tmp_path / "output"))
+    report = json.loads(report_path.read_text())
+    stages = {step["name"]: step for step in report["steps"]}
+    for stage in ["load_schema", *ProfileCrateGenerator.independent_stages, "make_docs", "write_metadata"]:
+        assert stage in stages
+        assert stages[stage]["wall_seconds"] >= 0
+    assert stages["make_shacl"]["output_bytes"] == (tmp_path / "output" / "shapes.ttl").stat().st_size
+    assert "serialize_shapes" in {step["name"] for step in stages["make_shacl"]["steps"]}
+    assert "render_html" in {step["name"] for step in stages["make_vocab"]["steps"]}
+
+def test_timings_measure_outputs(tmp_path: Path):
+    """
+    Output sizes should only be measured when a timings report has been requested
+    """
+    output = tmp_path / "output.txt"
+    output.write_text("output")
+    with timed("unmeasured", output=output) as step:
+        pass
+    assert step.output_bytes is None
+    with measuring_outputs(), timed("measured", output=output) as step:
+        pass
+    assert step.output_bytes == len("output")
+
+def test_shared_blank_nodes(process_run: str, tmp_path: Path):
+    """
+    A blank node that is referenced by several entities should only be written once
+    """
+    from rdflib import BNode, Literal, URIRef
+    from rdfcrate import uris
+    generator = ProfileCrateGenerator(process_run)
+    crate = generator.make_crate(tmp_path)
+    shared = BNode()
+    crate.graph.add((shared, uris.name, Literal("Shared")))
+    for name in ["a.txt", "b.txt"]:
+        crate.graph.add((URIRef(tmp_path.joinpath(name).as_uri()), uris.author, shared))
+    generator.write_metadata(crate)
+    ids = [entity["@id"] for entity in json.loads((tmp_path / "ro-crate-metadata.json").read_text())["@graph"]]
+    assert len(ids) == len(set(ids))
+    assert shared.n3() in ids
+
+def test_output_zip(process_run: str, tmp_path: Path):
+    """
+    A zipped crate should contain every artifact, and its metadata should describe them using paths within the zip file
+    """
+    from zipfile import ZipFile
+
+    zip_path = tmp_path / "profile.zip"
+    ProfileCrateGenerator(process_run, renderer="direct", output_zip=zip_path).serialize()
+    with ZipFile(zip_path) as archive:
+        names = set(archive.namelist())
+        assert len(names) == len(archive.namelist())
+        metadata = json.loads(archive.read("ro-crate-metadata.json"))
+    for name in ["index.html", "shapes.ttl", "mode.json", "linkml/ProcessRun.yml", "linkml/merged.yml", "vocabulary/html/index.html"]:
+        assert name in names
+    assert not any(name.startswith("/") or name.startswith("site/") for name in names)
+
+    ids = {entity["@id"] for entity in metadata["@graph"]} - {"./", "ro-crate-metadata.json"}
+    assert {"shapes.ttl", "mode.json", "index.html", "linkml/", "vocabulary/", "vocabulary/html/", "vocabulary/markdown/"} <= ids
+    for id in ids:
+        if not id.startswith("_:"):
+            assert any(name.startswith(id) for name in names)
+    assert list(tmp_path.iterdir()) == [zip_path]
+
+@pytest.mark.parametrize("renderer", ["mkdocs", "direct"])
+def test_parallel_matches_serial(process_run: str, renderer: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    Running the stages in worker processes should build exactly the same crate as running them in order
+    """
+    # MkDocs stamps each page and the sitemap with the build date, unless this is set
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1704067200")
+    def build(jobs: int) -> dict[str, bytes]:
+        output_dir = tmp_path / f"jobs-{jobs}"
+        ProfileCrateGenerator(process_run, renderer=renderer, jobs=jobs, date_published=datetime(2024, 1, 1)).serialize(str(output_dir))
+        return {str(path.relative_to(output_dir)): path.read_bytes() for path in sorted(output_dir.rglob("*")) if path.is_file()}
+
+    serial = build(1)
+    parallel = build(2)
+    assert serial.keys() == parallel.keys()
+    assert serial["ro-crate-metadata.json"] == parallel["ro-crate-metadata.json"]
+    assert b'"datePublished": "2024-01-01T00:00:00"' in serial["ro-crate-metadata.json"]
+    for name in serial:
+        assert serial[name] == parallel[name], name
+
+def test_incremental(process_run: str, tmp_path: Path):
+    """
+    An incremental rebuild should reuse unchanged outputs, and keep its manifest in the cache rather than in the crate
+    """
+    output_dir = tmp_path / "output"
+    args = dict(renderer="direct", cache_dir=tmp_path / "cache", incremental=True)
+    ProfileCrateGenerator(process_run, **args).serialize(str(output_dir))
+    assert [path.name for path in output_dir.iterdir() if path.name.startswith(".")] == []
+    assert len(list((tmp_path / "cache" / "manifests").glob("*.json"))) == 1
+
+    def metadata() -> list[dict]:
+        graph = json.loads((output_dir / "ro-crate-metadata.json").read_text())["@graph"]
+        for entity in graph:
+            entity.pop("datePublished", None)
+        return graph
+
+    shapes = output_dir / "shapes.ttl"
+    modified = shapes.stat().st_mtime_ns
+    full = metadata()
+    ProfileCrateGenerator(process_run, **args).serialize(str(output_dir))
+    assert shapes.stat().st_mtime_ns == modified
+    assert metadata() == full
+
+def test_incremental_docs(process_run: str, tmp_path: Path):
+    """
+    The profile page renders the crate graph, so it should be rebuilt when another stage is rebuilt with different options
+    """
+    output_dir = tmp_path / "output"
+    args = dict(renderer="direct", cache_dir=tmp_path / "cache", incremental=True)
+    ProfileCrateGenerator(process_run, merge_schema=False, **args).serialize(str(output_dir))
+    index = output_dir / "index.html"
+    modified = index.stat().st_mtime_ns
+    ProfileCrateGenerator(process_run, merge_schema=False, **args).serialize(str(output_dir))
+    assert index.stat().st_mtime_ns == modified
+    ProfileCrateGenerator(process_run, merge_schema=True, **args).serialize(str(output_dir))
+    assert index.stat().st_mtime_ns != modified
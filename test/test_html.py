@@ -1,5 +1,6 @@
 from proclaim.html.generator import ProfileHtmlGenerator
 import tempfile
+import os
 from pathlib import Path
 
 def test_profile_html_default(process_run: str):
@@ -19,3 +20,31 @@ def test_profile_html_custom_template(process_run: str):
         tmp = Path(_tmp)
         ProfileHtmlGenerator(schema=process_run, template_path=Path(__file__).parent / "test_template.jinja2").serialize(directory=_tmp)
         assert (tmp / "markdown" / "index.md").read_text() == "2"
+
+def test_template_cache(process_run: str, tmp_path: Path):
+    """
+    Checks that templates are only compiled once, but are recompiled when they are modified
+    """
+    template = tmp_path / "template.jinja2"
+    template.write_text("{{ 1 + 1 }}")
+    generator = ProfileHtmlGenerator(schema=process_run, template_path=template, bytecode_cache_dir=tmp_path / "cache")
+    assert generator.to_markdown(template) == "2"
+    assert generator.get_template(template) is generator.get_template(template)
+
+    template.write_text("{{ 2 + 2 }}")
+    os.utime(template, ns=(0, 0))
+    assert generator.to_markdown(template) == "4"
+    assert len(list((tmp_path / "cache").iterdir())) > 0
+
+def test_merged_output(process_run: str, tmp_path: Path):
+    """
+    Checks that the markdown and HTML can share the output directory, that other files in it are kept, and that no staging files are left behind
+    """
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "other.txt").write_text("kept")
+    (tmp_path / "index.md").write_text("replaced")
+    ProfileHtmlGenerator(schema=process_run, markdown_dir=Path(""), html_dir=Path("")).serialize(directory=str(tmp_path))
+    assert (tmp_path / "index.html").exists()
+    assert (tmp_path / "index.md").read_text() != "replaced"
+    assert (tmp_path / "assets" / "other.txt").read_text() == "kept"
+    assert not [path for path in tmp_path.iterdir() if path.name.startswith(".")]
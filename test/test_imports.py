@@ -0,0 +1,50 @@
+import subprocess
+import sys
+import pytest
+
+#: Seconds that importing a command's entry point may take. This is several times what it takes on a laptop, to allow for slow CI runners.
+CLI_IMPORT_BUDGET = 0.5
+
+#: Packages that the commands should only import once they run
+HEAVY_PACKAGES = {"linkml", "linkml_runtime", "rdflib", "rdfcrate", "mkdocs", "pydantic", "jinja2"}
+
+CLI_MODULES = ["proclaim.profile_crate.cli", "proclaim.mode.cli", "proclaim.shacl.cli"]
+
+def import_times(module: str) -> dict[str, float]:
+    """
+    Imports a module in a fresh interpreter, and returns the cumulative time in seconds, as reported by `python -X importtime`, of every module that it loaded
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        # Each line looks like "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+@pytest.mark.parametrize("module", CLI_MODULES)
+def test_cli_import_time(module: str):
+    """
+    The entry points should start without loading any generator or its dependencies
+    """
+    times = import_times(module)
+    assert not HEAVY_PACKAGES & {name.split(".")[0] for name in times}
+    assert times[module] < CLI_IMPORT_BUDGET
+
+def test_stages_load_their_generators():
+    """
+    The profile crate generator should leave the generators of each stage, and their dependencies, to be imported by the stage
+    """
+    times = import_times("proclaim.profile_crate.generator")
+    for module in ["mkdocs", "jinja2", "linkml.generators.shaclgen", "proclaim.mode.generator", "proclaim.vocabulary", "proclaim.html.generator"]:
+        assert module not in times
+
+def test_profile_stages():
+    """
+    The stages that the command can profile should be the stages of the generator
+    """
+    from proclaim.profile_crate.cli import STAGES
+    from proclaim.profile_crate.generator import ProfileCrateGenerator
+    assert STAGES == [*ProfileCrateGenerator.independent_stages, "make_docs"]
@@ -0,0 +1,32 @@
+from importlib.metadata import PackageNotFoundError
+from pathlib import Path
+import pytest
+from rdflib import BNode, Literal, URIRef
+from rdfcrate import uris
+from proclaim.profile_crate import manifest as manifest_module
+from proclaim.profile_crate.manifest import DEFAULT_VERSION, BuildManifest, proclaim_version
+
+
+def test_manifest_roundtrip(tmp_path: Path):
+    triples = [
+        (URIRef("vocabulary/"), uris.name, Literal("Custom Vocabulary")),
+        (BNode(), uris.description, Literal('Contains "quotes"\\nand newlines')),
+    ]
+    manifest = BuildManifest()
+    manifest.record("make_vocab", {"schema:a": "1234"}, triples)
+    manifest.write(tmp_path / "manifest.json")
+
+    loaded = BuildManifest.read(tmp_path / "manifest.json")
+    assert loaded.is_current("make_vocab", {"schema:a": "1234"})
+    assert not loaded.is_current("make_vocab", {"schema:a": "5678"})
+    assert not loaded.is_current("make_shacl", {"schema:a": "1234"})
+    assert loaded.stages["make_vocab"].triples == triples
+
+def test_missing_manifest(tmp_path: Path):
+    assert BuildManifest.read(tmp_path / "manifest.json").stages == {}
+
+def test_uninstalled_version(monkeypatch: pytest.MonkeyPatch):
+    def version(name: str) -> str:
+        raise PackageNotFoundError(name)
+    monkeypatch.setattr(manifest_module, "version", version)
+    assert proclaim_version() == DEFAULT_VERSION
@@ -1,3 +1,5 @@
+import json
+from pathlib import Path
 from linkml_runtime.utils.schemaview import SchemaView
 from proclaim.mode.generator import RoCrateModeGenerator
 
@@ -16,3 +18,42 @@ def test_mode_file_generation(process_run: str, process_run_sv: SchemaView):
             assert slot.id is not None and "wfrun:" not in slot.id
             assert slot.help is not None
             assert slot.label is not None
+
+def test_slots_converted_once(process_run: str):
+    """
+    Classes that share a slot should share its input definition
+    """
+    mode = RoCrateModeGenerator(schema=process_run).make_mode()
+    docker_inputs = {slot.name: slot for slot in mode.classes["DockerImage"].inputs}
+    sif_inputs = {slot.name: slot for slot in mode.classes["SIFImage"].inputs}
+    assert docker_inputs["tag"] is sif_inputs["tag"]
+
+def test_trusted_models_are_valid(process_run: str):
+    """
+    Mode files that are built without validation should still pass validation, and should serialize without nulls
+    """
+    from proclaim.mode.schema import ModeFile
+    serialized = RoCrateModeGenerator(schema=process_run).serialize()
+    assert "null" not in serialized
+    assert json.loads(ModeFile.model_validate_json(serialized).model_dump_json()) == json.loads(serialized)
+
+def test_compact_mode_file(process_run: str):
+    indented = RoCrateModeGenerator(schema=process_run).serialize()
+    compact = RoCrateModeGenerator(schema=process_run, compact=True).serialize()
+    assert "\n" not in compact
+    assert json.loads(compact) == json.loads(indented)
+
+def test_profile_stage(process_run: str, tmp_path: Path):
+    """
+    Profiling a stage should write a profile that pstats can load, and keep the summary out of the mode file on stdout
+    """
+    import pstats
+    from click.testing import CliRunner
+    from proclaim.mode.cli import cli
+
+    profile_path = tmp_path / "mode.prof"
+    result = CliRunner().invoke(cli, [process_run, "--profile-stage", "make_mode", "--profile-output", str(profile_path)])
+    assert result.exit_code == 0, result.output
+    json.loads(result.stdout)
+    assert "Ordered by: cumulative time" in result.stderr
+    assert any(function == "convert_class" for _, _, function in pstats.Stats(str(profile_path)).stats)  # type: ignore[attr-defined]
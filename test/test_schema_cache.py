@@ -0,0 +1,33 @@
+from pathlib import Path
+from linkml_runtime.utils.schemaview import SchemaView
+from proclaim.schema_cache import CachedSchemaView, SchemaCache
+
+
+def test_cached_imports(process_run: str, process_run_sv: SchemaView, tmp_path: Path):
+    cache = SchemaCache(tmp_path)
+    cold = CachedSchemaView(process_run, cache=cache)
+    assert set(cold.imports_closure()) == set(process_run_sv.imports_closure())
+    entries = set(tmp_path.glob("*.pickle"))
+    assert len(entries) > 0
+
+    # The second load should be served entirely from the cache
+    warm = CachedSchemaView(process_run, cache=cache)
+    assert warm.all_classes().keys() == process_run_sv.all_classes().keys()
+    assert set(tmp_path.glob("*.pickle")) == entries
+
+def test_cache_eviction(process_run: str, tmp_path: Path):
+    cache = SchemaCache(tmp_path, max_size=0)
+    # Files that other parts of proclaim cache in subdirectories are evicted too
+    (tmp_path / "jinja").mkdir()
+    (tmp_path / "jinja" / "template.cache").write_bytes(b"bytecode")
+    CachedSchemaView(process_run, cache=cache).imports_closure()
+    assert [path for path in tmp_path.rglob("*") if path.is_file()] == []
+
+def test_cached_copies(process_run: str, tmp_path: Path):
+    cache = SchemaCache(tmp_path)
+    first = CachedSchemaView(process_run, cache=cache)
+    first.induced_slot("name", "Thing")
+    # Queries fill in domain_of, which must not leak into other views of the same schemas
+    second = CachedSchemaView(process_run, cache=cache)
+    assert first.get_slot("name").domain_of
+    assert not second.get_slot("name").domain_of
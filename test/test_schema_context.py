@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from linkml_runtime.utils.schemaview import SchemaView
+from proclaim.schema_context import SchemaContext
+
+
+def test_schema_context(process_run_sv: SchemaView):
+    context = SchemaContext(process_run_sv).warm()
+    assert set(context.induced_slots.keys()) == set(process_run_sv.all_classes(imports=False).keys())
+    for cname, slots in context.induced_slots.items():
+        assert list(slots.keys()) == process_run_sv.class_slots(cname)
+        assert context.uris[cname] == process_run_sv.get_uri(cname, expand=True)
+
+def test_merged_schema_is_a_copy(process_run_sv: SchemaView):
+    """
+    Merging the imports should not leak imported elements into the original schema
+    """
+    context = SchemaContext(process_run_sv)
+    merged = context.merged_schema
+    assert "Thing" in merged.classes
+    assert merged.imports == []
+    assert "Thing" not in process_run_sv.schema.classes
+    assert len(process_run_sv.schema.imports) > 0
+
+def test_merged_schema_matches_merge_imports(process_run: str):
+    """
+    The merged schema should be the same as merging the imports of a freshly loaded schema, however much of the schema has been queried
+    """
+    from linkml_runtime.dumpers import yaml_dumper
+
+    expected = SchemaView(process_run)
+    expected.merge_imports()
+    context = SchemaContext(SchemaView(process_run)).warm()
+    assert yaml_dumper.dumps(context.merged_schema) == yaml_dumper.dumps(expected.schema)
+
+def test_slot_table(process_run_sv: SchemaView):
+    context = SchemaContext(process_run_sv)
+    for cname, rows in context.slot_table.items():
+        assert [row.name for row in rows] == context.class_slots[cname]
+        for row in rows:
+            assert row.range == process_run_sv.induced_slot(row.name, cname).range
+
+@pytest.mark.parametrize("schema", ["process_run", "features"])
+def test_jsonld_context(schema: str, request: pytest.FixtureRequest):
+    """
+    The context should be the same as the one made by LinkML's `ContextGenerator`, including the order of its terms
+    """
+    from linkml.generators.jsonldcontextgen import ContextGenerator
+
+    path = request.getfixturevalue(schema)
+    expected = json.loads(ContextGenerator(schema=path).serialize())
+    actual = SchemaContext(SchemaView(path)).jsonld_context
+    assert actual == expected
+    assert list(actual["@context"]) == list(expected["@context"])
+
+def test_jsonld_context_prefixes(process_run: str):
+    """
+    The context should have the prefixes of every import, however much of the schema was loaded beforehand
+    """
+    fresh = SchemaContext(SchemaView(process_run)).jsonld_context
+    loaded = SchemaView(process_run)
+    loaded.all_classes()
+    assert fresh == SchemaContext(loaded).jsonld_context
+    assert "schema" in fresh["@context"]
@@ -0,0 +1,57 @@
+import os
+from pathlib import Path
+from threading import Thread
+from typing import Iterator
+import pytest
+from proclaim.mode.generator import RoCrateModeGenerator
+from proclaim.server import ProclaimServer, run_on_server, send_request
+from proclaim.synthetic import SyntheticSchema
+
+
+@pytest.fixture
+def server(tmp_path: Path) -> Iterator[ProclaimServer]:
+    server = ProclaimServer(tmp_path / "server.sock", cache_dir=tmp_path / "cache")
+    with server.serve() as socket_server:
+        thread = Thread(target=socket_server.serve_forever)
+        thread.start()
+        try:
+            yield server
+        finally:
+            socket_server.shutdown()
+            thread.join()
+
+def test_no_server(tmp_path: Path):
+    """
+    Clients should be able to tell that no server is running, so that they can do the work themselves
+    """
+    assert send_request(tmp_path / "missing.sock", {"command": "ping"}) is None
+
+def test_mode(server: ProclaimServer, tmp_path: Path):
+    """
+    The server should give the same mode file as generating it in process, and reuse its generator until the schema changes
+    """
+    schema = SyntheticSchema(classes=5, slots=5, imports=1).write(tmp_path / "schema")
+    response = run_on_server(server.socket_path, "mode", {"schema": schema, "compact": True})
+    assert response is not None
+    assert response["output"] == RoCrateModeGenerator(schema=str(schema), compact=True).serialize()
+
+    [loaded] = server.generators.values()
+    run_on_server(server.socket_path, "mode", {"schema": schema, "compact": True})
+    assert server.generators[next(iter(server.generators))] is loaded
+
+    # Editing an import should reload the schema
+    imported = tmp_path / "schema" / "Synthetic_import_0.yaml"
+    os.utime(imported, ns=(imported.stat().st_atime_ns, imported.stat().st_mtime_ns + 1))
+    run_on_server(server.socket_path, "mode", {"schema": schema, "compact": True})
+    assert server.generators[next(iter(server.generators))] is not loaded
+
+def test_profile(server: ProclaimServer, tmp_path: Path):
+    schema = SyntheticSchema(classes=5, slots=5).write(tmp_path / "schema")
+    response = run_on_server(server.socket_path, "profile", {"schema": schema, "renderer": "direct"}, output_dir=str(tmp_path / "output"))
+    assert response is not None and response["ok"]
+    assert (tmp_path / "output" / "ro-crate-metadata.json").exists()
+
+    # Errors are reported to the client
+    with pytest.raises(Exception, match="description"):
+        (tmp_path / "Broken.yaml").write_text("id: https://example.org/Broken\nname: Broken\n")
+        run_on_server(server.socket_path, "profile", {"schema": tmp_path / "Broken.yaml"}, output_dir=str(tmp_path / "broken"))
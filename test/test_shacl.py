@@ -0,0 +1,46 @@
+import pytest
+from linkml.generators.shaclgen import ShaclGenerator
+from linkml_runtime.utils.schemaview import SchemaView
+from rdflib import BNode, Graph, Node, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF, SH
+
+from proclaim.schema_context import SchemaContext
+from proclaim.shacl.generator import ProfileShaclGenerator
+
+def shape_trees(graph: Graph) -> dict[Node, frozenset]:
+    """
+    Maps each node shape to its triples, with blank nodes replaced by their own triples, so that shapes can be compared regardless of blank node labels
+    """
+    def tree(node: Node):
+        if isinstance(node, BNode):
+            return frozenset((p, tree(o)) for p, o in graph.predicate_objects(node))
+        return node
+    return {shape: tree(shape) for shape in graph.subjects(RDF.type, SH.NodeShape)}
+
+@pytest.mark.parametrize("schema", ["process_run", "features"])
+def test_equivalent_to_linkml(schema: str, request: pytest.FixtureRequest):
+    """
+    Checks that the native shapes are the same as those produced by linkml's generator
+    """
+    path = request.getfixturevalue(schema)
+    ours = Graph().parse(data=ProfileShaclGenerator(schema=path, context=SchemaContext(SchemaView(path))).serialize(), format="turtle")
+    theirs = ShaclGenerator(schema=path).as_graph()
+    assert len(ours) == len(theirs)
+    assert shape_trees(ours) == shape_trees(theirs)
+    if schema == "features":
+        # This is too slow for large schemas, but unlike `shape_trees` it also covers triples outside the shapes
+        assert isomorphic(ours, theirs)
+
+def test_pruned(process_run: str, process_run_sv: SchemaView):
+    """
+    Checks that pruning only removes whole shapes, and keeps those of the schema's own classes and the classes they refer to
+    """
+    context = SchemaContext(process_run_sv)
+    full = shape_trees(Graph().parse(data=ProfileShaclGenerator(schema=process_run, context=context).serialize(), format="turtle"))
+    pruned = shape_trees(Graph().parse(data=ProfileShaclGenerator(schema=process_run, context=context, pruned=True).serialize(), format="turtle"))
+    assert len(pruned) < len(full)
+    for shape, tree in pruned.items():
+        assert full[shape] == tree
+    for cname in ["ContainerImage", "CreativeWork", "Intangible", "Thing"]:
+        assert URIRef(process_run_sv.get_uri(cname, expand=True)) in pruned
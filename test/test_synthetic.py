@@ -0,0 +1,25 @@
+from pathlib import Path
+from linkml_runtime.utils.schemaview import SchemaView
+from proclaim.mode.generator import RoCrateModeGenerator
+from proclaim.synthetic import SyntheticSchema
+
+
+def test_synthetic_schema(tmp_path: Path):
+    spec = SyntheticSchema(classes=40, slots=20, depth=2, imports=2, slot_usage=0.5)
+    sv = SchemaView(spec.write(tmp_path))
+    assert len(sv.imports_closure()) == 4
+    assert len(sv.all_classes()) == 40
+    assert any(cls.slot_usage for cls in sv.all_classes().values())
+    for slot in sv.all_slots().values():
+        assert slot.slot_uri is not None
+        assert slot.description is not None
+    for cname in sv.all_classes():
+        assert len(sv.class_ancestors(cname)) <= spec.depth + 1
+    # Every class of the main schema can be converted, which requires the schema's metadata and slot URIs
+    mode = RoCrateModeGenerator(schema=str(tmp_path / "Synthetic.yaml")).make_mode()
+    assert len(mode.classes) == len(sv.all_classes(imports=False))
+
+def test_synthetic_schema_is_reproducible(tmp_path: Path):
+    SyntheticSchema(seed=1).write(tmp_path / "a")
+    SyntheticSchema(seed=1).write(tmp_path / "b")
+    assert (tmp_path / "a" / "Synthetic.yaml").read_text() == (tmp_path / "b" / "Synthetic.yaml").read_text()
@@ -1,4 +1,8 @@
-from proclaim.vocabulary import VocabularyHtmlGenerator
+import pytest
+from proclaim.vocabulary import VocabularyHtmlGenerator, affected_pages
+from linkml_runtime.utils.schemaview import SchemaView
+from proclaim.schema_context import SchemaContext
+from shutil import copy
 import tempfile
 from pathlib import Path
 
@@ -10,3 +14,67 @@ def test_html_generator(process_run: str):
         assert (tmp / "html" / "classes" / "SIFImage" / "index.html").exists()
         assert (tmp / "html" / "properties" / "resourceUsage" / "index.html").exists()
         assert not (tmp / "site").exists()
+
+def test_property_domains(process_run: str, tmp_path: Path):
+    """
+    A property page lists the classes that declare the slot, even though they are only known once the induced slots are computed
+    """
+    VocabularyHtmlGenerator(schema=process_run, renderer="direct").serialize(directory=str(tmp_path))
+    def domain(sname: str) -> list[str]:
+        return (tmp_path / "markdown" / "properties" / f"{sname}.md").read_text().split("## Domain")[1].split()
+    for sname in ["md5", "sha1", "sha256", "sha512", "tag", "registry"]:
+        assert domain(sname) == ["*", "`ContainerImage`"]
+    for sname in ["sourceParameter", "targetParameter"]:
+        assert domain(sname) == ["*", "`ParameterConnection`"]
+
+def test_update_affected_pages(process_run: str, tmp_path: Path):
+    """
+    Checks that changing a slot only re-renders that slot and the classes that use it
+    """
+    for schema in Path(process_run).parent.glob("*.yaml"):
+        copy(schema, tmp_path)
+    schema_path = tmp_path / "process_run.yaml"
+    output = tmp_path / "output"
+    old = SchemaContext(SchemaView(schema_path))
+    VocabularyHtmlGenerator(schema=str(schema_path), context=old).serialize(directory=str(output))
+
+    schema_path.write_text(schema_path.read_text().replace("A tag assigned to a software product", "An updated tag"))
+    new = SchemaContext(SchemaView(schema_path))
+    properties, classes = affected_pages(old, new)
+    assert properties == {"tag"}
+    assert classes == {"ContainerImage", "DockerImage", "SIFImage"}
+
+    untouched = (output / "html" / "properties" / "sha1" / "index.html").stat().st_mtime_ns
+    VocabularyHtmlGenerator(schema=str(schema_path), context=new).update(str(output), properties, classes)
+    assert "An updated tag" in (output / "markdown" / "properties" / "tag.md").read_text()
+    assert "An updated tag" in (output / "markdown" / "classes" / "DockerImage.md").read_text()
+    assert "An updated tag" in (output / "html" / "properties" / "tag" / "index.html").read_text()
+    assert (output / "html" / "properties" / "sha1" / "index.html").stat().st_mtime_ns == untouched
+
+def test_direct_renderer(process_run: str, tmp_path: Path):
+    """
+    Checks that the direct renderer uses the same page layout as MkDocs
+    """
+    VocabularyHtmlGenerator(schema=process_run, renderer="direct").serialize(directory=str(tmp_path))
+    assert (tmp_path / "html" / "index.html").exists()
+    page = (tmp_path / "html" / "classes" / "SIFImage" / "index.html").read_text()
+    assert "<table>" in page
+    assert '<a href="../../">' in page
+    assert (tmp_path / "html" / "properties" / "resourceUsage" / "index.html").exists()
+
+@pytest.mark.parametrize("renderer", ["mkdocs", "direct"])
+def test_parallel_rendering(process_run: str, renderer: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    Checks that rendering the pages in forked worker processes gives the same result as rendering them serially
+    """
+    # MkDocs stamps each page and the sitemap with the build date, unless this is set
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1704067200")
+    context = SchemaContext(SchemaView(process_run))
+    for jobs in [1, 4]:
+        VocabularyHtmlGenerator(schema=process_run, context=context, renderer=renderer, jobs=jobs, batch_size=2).serialize(directory=str(tmp_path / str(jobs)))
+    serial = sorted(path.relative_to(tmp_path / "1") for path in (tmp_path / "1").rglob("*"))
+    parallel = sorted(path.relative_to(tmp_path / "4") for path in (tmp_path / "4").rglob("*"))
+    assert serial == parallel
+    for path in serial:
+        if (tmp_path / "1" / path).is_file():
+            assert (tmp_path / "1" / path).read_bytes() == (tmp_path / "4" / path).read_bytes(), path